@@ -18,7 +18,7 @@ load_dotenv()
 from config import config
 
 # Import database and models
-from modules.database import init_database, create_initial_admin, create_sample_data, get_connection
+from modules.database import init_database, create_initial_admin, create_sample_data_in_background, sample_data_setting_up, get_connection
 from modules.models import (
     # Clinic management
     create_clinic, get_clinic_by_id, get_clinic_by_slug, update_clinic,
@@ -100,7 +100,7 @@ except Exception as e:
 # NEVER runs in production to protect real data
 is_production = os.environ.get('FLASK_ENV') == 'production' or os.environ.get('ENVIRONMENT') == 'production'
 if not is_production and os.environ.get('CREATE_SAMPLE_DATA', 'False') == 'True':
-    create_sample_data()
+    create_sample_data_in_background()  # Seeds while the server starts accepting requests
 
 
 # ============== Authentication Decorators ==============
@@ -924,6 +924,7 @@ def api_setup_status():
         'equipment_set': equipment_count >= 1,
         'consumables_set': (consumables_count + materials_count) >= 1,
         'services_set': services_count >= 1,
+        'sample_data_setting_up': sample_data_setting_up(),
     })
 
 
@@ -60,6 +60,11 @@ class Config:
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER')
     MAIL_DEBUG = os.environ.get('MAIL_DEBUG', 'False') == 'True'
+    # Send emails from a background thread so requests don't wait on SMTP.
+    # Off on Vercel, where the function is frozen once the response is sent.
+    MAIL_ASYNC = os.environ.get('MAIL_ASYNC', 'False' if os.environ.get('VERCEL') else 'True') == 'True'
+    # Recycle the worker's SMTP connection after this many messages
+    MAIL_MAX_EMAILS = int(os.environ.get('MAIL_MAX_EMAILS', 100))
 
     # Frontend URL for email links
     FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:5002')
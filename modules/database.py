@@ -3,17 +3,97 @@ Database Module - MySQL database schema and connection management for Dental Pri
 """
 
 import pymysql
+import pymysql.connections
 import pymysql.cursors
+from pymysql.constants import CLIENT
+import atexit
+import base64
 import hashlib
+import hmac
 import secrets
 import os
 import sys
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain, islice
 from pathlib import Path
 
 
+# Idle connections kept per process for reuse by get_connection()
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 4))
+_idle_connections = []
+_pool_lock = threading.Lock()
+
+
+class PooledConnection(pymysql.connections.Connection):
+    """Connection whose close() returns it to the idle pool instead of hanging up"""
+
+    _checked_out = False
+
+    def close(self):
+        if not self._checked_out or not self.open:
+            return
+        self._checked_out = False
+        try:
+            # End whatever transaction (and read snapshot) the borrower left open
+            self.rollback()
+        except pymysql.MySQLError:
+            self._force_close()
+            return
+        with _pool_lock:
+            if len(_idle_connections) < DB_POOL_SIZE:
+                _idle_connections.append(self)
+                return
+        pymysql.connections.Connection.close(self)
+
+
 def get_connection():
-    """Get MySQL database connection with DictCursor"""
+    """Get MySQL database connection with DictCursor
+
+    Reuses an idle pooled connection when one is available, so most requests
+    skip the TCP/TLS handshake and authentication. Callers still close() the
+    connection when done; that hands it back to the pool.
+    """
+    conn = None
+    with _pool_lock:
+        if _idle_connections:
+            conn = _idle_connections.pop()
+    if conn is not None:
+        try:
+            # Transparently reconnects if the server dropped the idle connection
+            conn.ping(reconnect=True)
+        except pymysql.MySQLError:
+            conn = None
+    if conn is None:
+        conn = PooledConnection(**_connect_args())
+    conn._checked_out = True
+    return conn
+
+
+def close_all_connections():
+    """Hang up every idle pooled connection (registered to run at interpreter exit)"""
+    with _pool_lock:
+        idle = _idle_connections[:]
+        _idle_connections.clear()
+    for conn in idle:
+        try:
+            pymysql.connections.Connection.close(conn)
+        except pymysql.MySQLError:
+            conn._force_close()
+
+
+atexit.register(close_all_connections)
+
+
+@lru_cache(maxsize=None)
+def _connect_args():
+    """Connection parameters for the configured MySQL server
+
+    Read from the environment (and the CA path resolved) once per process.
+    Callers unpack the result and must not mutate it.
+    """
     connect_args = {
         'host': os.environ.get('DB_HOST', '127.0.0.1'),
         'port': int(os.environ.get('DB_PORT', 3308)),
@@ -36,399 +116,656 @@ def get_connection():
             if os.path.exists(ca_path):
                 ssl_config['ca'] = ca_path
         connect_args['ssl'] = ssl_config
-    conn = pymysql.connect(**connect_args)
-    return conn
+    return connect_args
+
+
+@contextmanager
+def scoped_connection(conn=None):
+    """Yield a connection for one unit of work
+
+    A caller-supplied connection is passed straight through and stays part of
+    the caller's transaction. Otherwise a new connection is opened, committed
+    on success, rolled back on error and always closed, so seed helpers can be
+    chained on a single connection instead of each paying for a handshake.
+    """
+    if conn is not None:
+        yield conn
+        return
+
+    conn = get_connection()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
 
 
 def dict_from_row(row):
-    """Convert row to dictionary"""
-    return dict(row) if row else None
+    """Convert row to dictionary
+
+    DictCursor rows are already plain dicts, so they are returned as-is
+    rather than copied; only empty results are normalized to None.
+    """
+    return row if row else None
+
+
+# New passwords are hashed with scrypt, which is memory-hard and so much less
+# suited to GPU cracking than PBKDF2. Stored in PHC string form,
+# $scrypt$ln=15,r=8,p=1$<salt>$<digest>, with unpadded base64 fields.
+# The cost is tunable per deployment with SCRYPT_LOG_N (n = 2**SCRYPT_LOG_N):
+# each step doubles login CPU time and memory, and stored hashes made with
+# other parameters are upgraded on the next successful login.
+SCRYPT_LOG_N = int(os.environ.get('SCRYPT_LOG_N', 15))
+if not 10 <= SCRYPT_LOG_N <= 20:
+    raise ValueError(f"SCRYPT_LOG_N must be between 10 and 20, got {SCRYPT_LOG_N}")
+SCRYPT_N = 1 << SCRYPT_LOG_N
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_DKLEN = 32
+# Highest parallelization a stored hash may use
+SCRYPT_MAX_P = 16
+# hashlib.scrypt refuses a maxmem above INT_MAX; stored hashes whose cost
+# needs more than that are rejected as malformed instead of being derived
+SCRYPT_MAX_MEMORY = 2 ** 31 - 1
+
+
+def _scrypt_maxmem(n, r, p):
+    """maxmem for hashlib.scrypt: twice the 128 * r * (n + p) bytes the given cost needs
+
+    Worked out from each hash's own parameters, so hashes made under another
+    SCRYPT_LOG_N still verify, and capped at SCRYPT_MAX_MEMORY, which still
+    covers n=2**20, r=8.
+    """
+    return min(2 * 128 * r * (n + p), SCRYPT_MAX_MEMORY)
+
+
+_SCRYPT_PREFIX = f"$scrypt$ln={SCRYPT_N.bit_length() - 1},r={SCRYPT_R},p={SCRYPT_P}$"
+
+# Legacy hashes are verified but never written; they are upgraded on the next
+# successful login:
+#   hexsalt$hexdigest             PBKDF2-SHA256, 100000 iterations
+PBKDF2_ALGORITHM = 'sha256'
+PBKDF2_ITERATIONS = 100000
+
+
+def _b64encode(data):
+    return base64.b64encode(data).rstrip(b'=').decode('ascii')
 
 
-def hash_password(password, salt=None):
-    """Hash password with PBKDF2-SHA256"""
-    if salt is None:
-        salt = secrets.token_hex(32)
-    pwd_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-    return f"{salt}${pwd_hash.hex()}"
+def _b64decode(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4), validate=True)
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password, salt=salt, n=n, r=r, p=p,
+                          maxmem=_scrypt_maxmem(n, r, p), dklen=SCRYPT_DKLEN)
+
+
+def hash_password(password):
+    """Hash password (str, or already-encoded UTF-8 bytes) with scrypt"""
+    if isinstance(password, str):
+        password = password.encode()
+    salt = secrets.token_bytes(16)
+    pwd_hash = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"{_SCRYPT_PREFIX}{_b64encode(salt)}${_b64encode(pwd_hash)}"
+
+
+def _parse_password_hash(stored_hash):
+    """Split a stored hash into (kdf, salt, params, digest) without deriving anything
+
+    Raises ValueError (or KeyError for missing scrypt parameters) on anything
+    that is not a well-formed hash, or whose scrypt parameters hashlib.scrypt
+    would refuse, so garbage is rejected before the KDF runs.
+    """
+    if stored_hash.startswith('$scrypt$'):
+        _, _, params, salt, digest = stored_hash.split('$')
+        params = dict(item.split('=') for item in params.split(','))
+        ln, r, p = int(params['ln']), int(params['r']), int(params['p'])
+        salt, digest = _b64decode(salt), _b64decode(digest)
+    else:
+        # Legacy PBKDF2: the salt is used as text, the digest is 32 bytes of hex
+        salt, digest = stored_hash.split('$')
+        digest = bytes.fromhex(digest)
+        if not salt or len(digest) != hashlib.new(PBKDF2_ALGORITHM).digest_size:
+            raise ValueError('malformed password hash')
+        return 'pbkdf2', salt.encode(), None, digest
+    # The limits hashlib.scrypt (OpenSSL) enforces: n a power of two above 1,
+    # r * p below 2**30 and the memory the derivation allocates; p, which
+    # multiplies the CPU time, is also capped at SCRYPT_MAX_P
+    if (len(digest) != SCRYPT_DKLEN or not 1 <= ln < 64 or r < 1 or not 1 <= p <= SCRYPT_MAX_P
+            or r * p >= 1 << 30 or 128 * r * ((1 << ln) + p + 2) > SCRYPT_MAX_MEMORY):
+        raise ValueError('malformed password hash')
+    return 'scrypt', salt, (1 << ln, r, p), digest
 
 
 def verify_password(password, stored_hash):
-    """Verify password against stored hash"""
+    """Verify password (str or UTF-8 bytes) against stored hash (scrypt or legacy PBKDF2)"""
+    if not isinstance(stored_hash, str) or not isinstance(password, (str, bytes)):
+        return False
+    if isinstance(password, str):
+        password = password.encode()
     try:
-        salt, _ = stored_hash.split('$')
-        return hash_password(password, salt) == stored_hash
-    except:
+        kdf, salt, params, expected = _parse_password_hash(stored_hash)
+    except (ValueError, KeyError):
         return False
+    if kdf == 'scrypt':
+        pwd_hash = _scrypt(password, salt, *params)
+    else:
+        pwd_hash = hashlib.pbkdf2_hmac(PBKDF2_ALGORITHM, password, salt, PBKDF2_ITERATIONS)
+    # Constant-time comparison of the raw digests
+    return hmac.compare_digest(pwd_hash, expected)
+
+
+def password_needs_rehash(stored_hash):
+    """True if stored_hash is not a scrypt hash in the current format and parameters"""
+    return not stored_hash.startswith(_SCRYPT_PREFIX)
+
 
+@lru_cache(maxsize=64)
+def _bulk_insert_sql(table, columns, row_count):
+    """Build (and memoize) the multi-row INSERT text for a table/column/row-count shape"""
+    row_placeholders = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+            + ', '.join([row_placeholders] * row_count))
 
-def _get_table_columns(cursor, table_name):
-    """Get list of column names for a table"""
+
+def _bulk_insert(cursor, table, columns, rows, chunk_size=500):
+    """Insert rows with one multi-row INSERT ... VALUES (...),(...) per chunk
+
+    Chunks keep each statement well under max_allowed_packet. PyMySQL has no
+    server-side prepared statements, so the statement text is cached instead
+    and reused whenever a clinic is seeded again.
+    """
+    # Pull rows lazily so generator input is never materialized as a whole
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        sql = _bulk_insert_sql(table, columns, len(chunk))
+        cursor.execute(sql, list(chain.from_iterable(chunk)))
+
+
+def _get_schema_columns(cursor):
+    """Get the set of column names for every table in the database, keyed by table"""
+    cursor.execute("""
+        SELECT TABLE_NAME, COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = %s
+    """, (os.environ.get('DB_NAME', 'dental_calculator'),))
+    columns = {}
+    for row in cursor.fetchall():
+        columns.setdefault(row['TABLE_NAME'], set()).add(row['COLUMN_NAME'])
+    return columns
+
+
+def _get_table_indexes(cursor, table_name):
+    """Get set of index names for a table"""
     cursor.execute("""
-        SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS
+        SELECT DISTINCT INDEX_NAME FROM INFORMATION_SCHEMA.STATISTICS
         WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
     """, (os.environ.get('DB_NAME', 'dental_calculator'), table_name))
-    return [row['COLUMN_NAME'] for row in cursor.fetchall()]
+    return {row['INDEX_NAME'] for row in cursor.fetchall()}
 
 
-def init_database():
-    """Initialize database with all tables"""
-    conn = get_connection()
-    cursor = conn.cursor()
+def _add_missing_columns(cursor, table_name, existing, columns):
+    """Add the (name, definition) columns missing from a table in one ALTER TABLE"""
+    missing = [f'ADD COLUMN {name} {definition}' for name, definition in columns if name not in existing]
+    if missing:
+        cursor.execute(f"ALTER TABLE {table_name} {', '.join(missing)}")
+
+
+# Bump whenever SCHEMA_TABLES or the migrations in init_database() change;
+# databases already stamped with this version skip initialization entirely
+SCHEMA_VERSION = 3
 
+# Table definitions, sent to the server as a single multi-statement batch by
+# init_database(). Column additions for older databases live in the
+# migrations below the batch.
+SCHEMA_TABLES = (
     # Clinics table (multi-tenant support)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS clinics (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            name VARCHAR(255) NOT NULL,
-            slug VARCHAR(100) UNIQUE NOT NULL,
-            email VARCHAR(255),
-            phone VARCHAR(50),
-            address TEXT,
-            city VARCHAR(255),
-            country VARCHAR(255) DEFAULT 'Egypt',
-            logo_url VARCHAR(255),
-            subscription_plan VARCHAR(100) DEFAULT 'professional',
-            subscription_status VARCHAR(100) DEFAULT 'trial',
-            subscription_expires_at DATE,
-            last_payment_date DATE,
-            last_payment_amount DOUBLE,
-            grace_period_start DATE,
-            max_users INT DEFAULT 10,
-            max_services INT DEFAULT 100,
-            is_active TINYINT(1) DEFAULT 1,
-            onboarding_completed TINYINT(1) DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS clinics (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        name VARCHAR(255) NOT NULL,
+        slug VARCHAR(100) UNIQUE NOT NULL,
+        email VARCHAR(255),
+        phone VARCHAR(50),
+        address TEXT,
+        city VARCHAR(255),
+        country VARCHAR(255) DEFAULT 'Egypt',
+        logo_url VARCHAR(255),
+        subscription_plan VARCHAR(100) DEFAULT 'professional',
+        subscription_status VARCHAR(100) DEFAULT 'trial',
+        subscription_expires_at DATE,
+        last_payment_date DATE,
+        last_payment_amount DOUBLE,
+        grace_period_start DATE,
+        max_users INT DEFAULT 10,
+        max_services INT DEFAULT 100,
+        is_active TINYINT(1) DEFAULT 1,
+        onboarding_completed TINYINT(1) DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Users table (updated with clinic_id and role)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            clinic_id INT,
-            username VARCHAR(255) NOT NULL,
-            password_hash TEXT NOT NULL,
-            first_name VARCHAR(255) NOT NULL,
-            last_name VARCHAR(255) NOT NULL,
-            email VARCHAR(255),
-            role VARCHAR(100) DEFAULT 'staff',
-            is_super_admin TINYINT(1) DEFAULT 0,
-            is_active TINYINT(1) DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (clinic_id) REFERENCES clinics(id),
-            UNIQUE(clinic_id, username)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS users (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        clinic_id INT,
+        username VARCHAR(255) NOT NULL,
+        password_hash TEXT NOT NULL,
+        first_name VARCHAR(255) NOT NULL,
+        last_name VARCHAR(255) NOT NULL,
+        email VARCHAR(255),
+        role VARCHAR(100) DEFAULT 'staff',
+        is_super_admin TINYINT(1) DEFAULT 0,
+        is_active TINYINT(1) DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (clinic_id) REFERENCES clinics(id),
+        UNIQUE(clinic_id, username),
+        INDEX idx_username (username),
+        INDEX idx_email (email)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Global Settings table (per clinic)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS global_settings (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            clinic_id INT NOT NULL,
-            currency VARCHAR(100) DEFAULT 'EGP',
-            vat_percent DOUBLE DEFAULT 0,
-            default_profit_percent DOUBLE DEFAULT 40,
-            rounding_nearest INT DEFAULT 1,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (clinic_id) REFERENCES clinics(id),
-            UNIQUE(clinic_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS global_settings (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        clinic_id INT NOT NULL,
+        currency VARCHAR(100) DEFAULT 'EGP',
+        vat_percent DOUBLE DEFAULT 0,
+        default_profit_percent DOUBLE DEFAULT 40,
+        rounding_nearest INT DEFAULT 1,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (clinic_id) REFERENCES clinics(id),
+        UNIQUE(clinic_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Fixed Costs table (per clinic)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS fixed_costs (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            clinic_id INT NOT NULL,
-            category VARCHAR(255) NOT NULL,
-            monthly_amount DOUBLE NOT NULL,
-            included TINYINT(1) DEFAULT 1,
-            notes TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (clinic_id) REFERENCES clinics(id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS fixed_costs (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        clinic_id INT NOT NULL,
+        category VARCHAR(255) NOT NULL,
+        monthly_amount DOUBLE NOT NULL,
+        included TINYINT(1) DEFAULT 1,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (clinic_id) REFERENCES clinics(id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Salaries table (per clinic)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS salaries (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            clinic_id INT NOT NULL,
-            role_name VARCHAR(255) NOT NULL,
-            monthly_salary DOUBLE NOT NULL,
-            included TINYINT(1) DEFAULT 1,
-            notes TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (clinic_id) REFERENCES clinics(id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS salaries (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        clinic_id INT NOT NULL,
+        role_name VARCHAR(255) NOT NULL,
+        monthly_salary DOUBLE NOT NULL,
+        included TINYINT(1) DEFAULT 1,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (clinic_id) REFERENCES clinics(id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Equipment table (per clinic)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS equipment (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            clinic_id INT NOT NULL,
-            asset_name VARCHAR(255) NOT NULL,
-            purchase_cost DOUBLE NOT NULL,
-            life_years INT NOT NULL,
-            allocation_type VARCHAR(50) CHECK(allocation_type IN ('fixed', 'per-hour')) NOT NULL,
-            monthly_usage_hours DOUBLE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (clinic_id) REFERENCES clinics(id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS equipment (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        clinic_id INT NOT NULL,
+        asset_name VARCHAR(255) NOT NULL,
+        purchase_cost DOUBLE NOT NULL,
+        life_years INT NOT NULL,
+        allocation_type VARCHAR(50) CHECK(allocation_type IN ('fixed', 'per-hour')) NOT NULL,
+        monthly_usage_hours DOUBLE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (clinic_id) REFERENCES clinics(id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Clinic Capacity Settings table (per clinic)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS clinic_capacity (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            clinic_id INT NOT NULL,
-            chairs INT DEFAULT 1,
-            days_per_month INT DEFAULT 24,
-            hours_per_day INT DEFAULT 8,
-            utilization_percent DOUBLE DEFAULT 80,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (clinic_id) REFERENCES clinics(id),
-            UNIQUE(clinic_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS clinic_capacity (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        clinic_id INT NOT NULL,
+        chairs INT DEFAULT 1,
+        days_per_month INT DEFAULT 24,
+        hours_per_day INT DEFAULT 8,
+        utilization_percent DOUBLE DEFAULT 80,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (clinic_id) REFERENCES clinics(id),
+        UNIQUE(clinic_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Consumables Library table (per clinic)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS consumables (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            clinic_id INT NOT NULL,
-            item_name VARCHAR(255) NOT NULL,
-            pack_cost DOUBLE NOT NULL,
-            cases_per_pack INT NOT NULL,
-            units_per_case INT DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (clinic_id) REFERENCES clinics(id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS consumables (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        clinic_id INT NOT NULL,
+        item_name VARCHAR(255) NOT NULL,
+        pack_cost DOUBLE NOT NULL,
+        cases_per_pack INT NOT NULL,
+        units_per_case INT DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (clinic_id) REFERENCES clinics(id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Service Categories table (per clinic)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS service_categories (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            clinic_id INT NOT NULL,
-            name VARCHAR(255) NOT NULL,
-            display_order INT DEFAULT 0,
-            is_active TINYINT(1) DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            name_ar VARCHAR(255),
-            FOREIGN KEY (clinic_id) REFERENCES clinics(id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS service_categories (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        clinic_id INT NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        display_order INT DEFAULT 0,
+        is_active TINYINT(1) DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        name_ar VARCHAR(255),
+        FOREIGN KEY (clinic_id) REFERENCES clinics(id),
+        INDEX idx_clinic_order (clinic_id, display_order)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Services table (per clinic)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS services (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            clinic_id INT NOT NULL,
-            category_id INT,
-            name VARCHAR(255) NOT NULL,
-            chair_time_hours DOUBLE NOT NULL,
-            doctor_hourly_fee DOUBLE NOT NULL,
-            use_default_profit TINYINT(1) DEFAULT 1,
-            custom_profit_percent DOUBLE,
-            equipment_id INT,
-            equipment_hours_used DOUBLE,
-            current_price DOUBLE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (clinic_id) REFERENCES clinics(id),
-            FOREIGN KEY (category_id) REFERENCES service_categories(id),
-            FOREIGN KEY (equipment_id) REFERENCES equipment(id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
-
-    # Add current_price column if it doesn't exist (migration)
-    columns = _get_table_columns(cursor, 'services')
-    if 'current_price' not in columns:
-        cursor.execute('ALTER TABLE services ADD COLUMN current_price DOUBLE')
-
-    # Add doctor fee type columns if they don't exist (migration)
-    if 'doctor_fee_type' not in columns:
-        cursor.execute("ALTER TABLE services ADD COLUMN doctor_fee_type VARCHAR(50) DEFAULT 'hourly'")
-    if 'doctor_fixed_fee' not in columns:
-        cursor.execute('ALTER TABLE services ADD COLUMN doctor_fixed_fee DOUBLE DEFAULT 0')
-    if 'doctor_percentage' not in columns:
-        cursor.execute('ALTER TABLE services ADD COLUMN doctor_percentage DOUBLE DEFAULT 0')
-    if 'category_id' not in columns:
-        cursor.execute('ALTER TABLE services ADD COLUMN category_id INT')
+    '''
+    CREATE TABLE IF NOT EXISTS services (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        clinic_id INT NOT NULL,
+        category_id INT,
+        name VARCHAR(255) NOT NULL,
+        chair_time_hours DOUBLE NOT NULL,
+        doctor_hourly_fee DOUBLE NOT NULL,
+        use_default_profit TINYINT(1) DEFAULT 1,
+        custom_profit_percent DOUBLE,
+        equipment_id INT,
+        equipment_hours_used DOUBLE,
+        current_price DOUBLE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (clinic_id) REFERENCES clinics(id),
+        FOREIGN KEY (category_id) REFERENCES service_categories(id),
+        FOREIGN KEY (equipment_id) REFERENCES equipment(id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Service Consumables (junction table)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS service_consumables (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            service_id INT NOT NULL,
-            consumable_id INT NOT NULL,
-            quantity DOUBLE NOT NULL,
-            FOREIGN KEY (service_id) REFERENCES services(id) ON DELETE CASCADE,
-            FOREIGN KEY (consumable_id) REFERENCES consumables(id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS service_consumables (
+        id INT NOT NULL AUTO_INCREMENT,
+        service_id INT NOT NULL,
+        consumable_id INT NOT NULL,
+        quantity DOUBLE NOT NULL,
+        PRIMARY KEY (service_id, id),
+        KEY idx_id (id),
+        FOREIGN KEY (service_id) REFERENCES services(id) ON DELETE CASCADE,
+        FOREIGN KEY (consumable_id) REFERENCES consumables(id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Lab Materials Library table (per clinic)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS lab_materials (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            clinic_id INT NOT NULL,
-            material_name VARCHAR(255) NOT NULL,
-            lab_name VARCHAR(255),
-            unit_cost DOUBLE NOT NULL,
-            unit_type VARCHAR(50) DEFAULT 'per unit',
-            description TEXT,
-            name_ar VARCHAR(255),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (clinic_id) REFERENCES clinics(id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS lab_materials (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        clinic_id INT NOT NULL,
+        material_name VARCHAR(255) NOT NULL,
+        lab_name VARCHAR(255),
+        unit_cost DOUBLE NOT NULL,
+        unit_type VARCHAR(50) DEFAULT 'per unit',
+        description TEXT,
+        name_ar VARCHAR(255),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (clinic_id) REFERENCES clinics(id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Service Materials (junction table)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS service_materials (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            service_id INT NOT NULL,
-            material_id INT NOT NULL,
-            quantity DOUBLE NOT NULL,
-            custom_unit_price DOUBLE,
-            FOREIGN KEY (service_id) REFERENCES services(id) ON DELETE CASCADE,
-            FOREIGN KEY (material_id) REFERENCES lab_materials(id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS service_materials (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        service_id INT NOT NULL,
+        material_id INT NOT NULL,
+        quantity DOUBLE NOT NULL,
+        custom_unit_price DOUBLE,
+        FOREIGN KEY (service_id) REFERENCES services(id) ON DELETE CASCADE,
+        FOREIGN KEY (material_id) REFERENCES lab_materials(id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Service Equipment (junction table for multiple equipment per service)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS service_equipment (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            service_id INT NOT NULL,
-            equipment_id INT NOT NULL,
-            hours_used DOUBLE NOT NULL DEFAULT 0.25,
-            FOREIGN KEY (service_id) REFERENCES services(id) ON DELETE CASCADE,
-            FOREIGN KEY (equipment_id) REFERENCES equipment(id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS service_equipment (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        service_id INT NOT NULL,
+        equipment_id INT NOT NULL,
+        hours_used DOUBLE NOT NULL DEFAULT 0.25,
+        FOREIGN KEY (service_id) REFERENCES services(id) ON DELETE CASCADE,
+        FOREIGN KEY (equipment_id) REFERENCES equipment(id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Email verification tokens table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS email_verification_tokens (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            user_id INT NOT NULL,
-            token_hash VARCHAR(255) UNIQUE NOT NULL,
-            expires_at TIMESTAMP NOT NULL,
-            used TINYINT(1) DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS email_verification_tokens (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        user_id INT NOT NULL,
+        token_hash VARCHAR(255) UNIQUE NOT NULL,
+        expires_at TIMESTAMP NOT NULL,
+        used TINYINT(1) DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Password reset tokens table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS password_reset_tokens (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            user_id INT NOT NULL,
-            token_hash VARCHAR(255) UNIQUE NOT NULL,
-            expires_at TIMESTAMP NOT NULL,
-            used TINYINT(1) DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS password_reset_tokens (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        user_id INT NOT NULL,
+        token_hash VARCHAR(255) UNIQUE NOT NULL,
+        expires_at TIMESTAMP NOT NULL,
+        used TINYINT(1) DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Invitation tokens table (for inviting users to clinics)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS invitation_tokens (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            clinic_id INT NOT NULL,
-            email VARCHAR(255) NOT NULL,
-            role VARCHAR(100) DEFAULT 'staff',
-            token VARCHAR(255) UNIQUE NOT NULL,
-            expires_at TIMESTAMP NOT NULL,
-            used TINYINT(1) DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (clinic_id) REFERENCES clinics(id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS invitation_tokens (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        clinic_id INT NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        role VARCHAR(100) DEFAULT 'staff',
+        token VARCHAR(255) UNIQUE NOT NULL,
+        expires_at TIMESTAMP NOT NULL,
+        used TINYINT(1) DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (clinic_id) REFERENCES clinics(id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Subscription payments table (for tracking payments)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS subscription_payments (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            clinic_id INT NOT NULL,
-            amount DOUBLE NOT NULL,
-            currency VARCHAR(100) DEFAULT 'EGP',
-            payment_date DATE NOT NULL,
-            payment_method VARCHAR(50) CHECK(payment_method IN ('cash', 'bank_transfer', 'check', 'other')),
-            months_paid INT DEFAULT 1,
-            receipt_number VARCHAR(255),
-            payment_notes TEXT,
-            recorded_by INT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (clinic_id) REFERENCES clinics(id),
-            FOREIGN KEY (recorded_by) REFERENCES users(id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS case_tracker_entries (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            clinic_id INT NOT NULL,
-            month VARCHAR(7) NOT NULL,
-            service_id INT NOT NULL,
-            case_count INT NOT NULL DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            UNIQUE KEY uq_clinic_month_service (clinic_id, month, service_id),
-            FOREIGN KEY (clinic_id) REFERENCES clinics(id),
-            FOREIGN KEY (service_id) REFERENCES services(id) ON DELETE CASCADE
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS subscription_payments (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        clinic_id INT NOT NULL,
+        amount DOUBLE NOT NULL,
+        currency VARCHAR(100) DEFAULT 'EGP',
+        payment_date DATE NOT NULL,
+        payment_method VARCHAR(50) CHECK(payment_method IN ('cash', 'bank_transfer', 'check', 'other')),
+        months_paid INT DEFAULT 1,
+        receipt_number VARCHAR(255),
+        payment_notes TEXT,
+        recorded_by INT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (clinic_id) REFERENCES clinics(id),
+        FOREIGN KEY (recorded_by) REFERENCES users(id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
+
+    '''
+    CREATE TABLE IF NOT EXISTS case_tracker_entries (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        clinic_id INT NOT NULL,
+        month VARCHAR(7) NOT NULL,
+        service_id INT NOT NULL,
+        case_count INT NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        UNIQUE KEY uq_clinic_month_service (clinic_id, month, service_id),
+        FOREIGN KEY (clinic_id) REFERENCES clinics(id),
+        FOREIGN KEY (service_id) REFERENCES services(id) ON DELETE CASCADE
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # Calculator leads table (anonymous, public-facing)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS calculator_leads (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            session_id VARCHAR(255) NOT NULL,
-            size VARCHAR(20) NOT NULL,
-            city VARCHAR(20) NOT NULL,
-            rent DOUBLE NOT NULL,
-            hours DOUBLE NOT NULL DEFAULT 8,
-            cph_result DOUBLE,
-            total_costs DOUBLE,
-            currency VARCHAR(10) DEFAULT 'EGP',
-            converted TINYINT(1) DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            UNIQUE KEY uq_session (session_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS calculator_leads (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        session_id VARCHAR(255) NOT NULL,
+        size VARCHAR(20) NOT NULL,
+        city VARCHAR(20) NOT NULL,
+        rent DOUBLE NOT NULL,
+        hours DOUBLE NOT NULL DEFAULT 8,
+        cph_result DOUBLE,
+        total_costs DOUBLE,
+        currency VARCHAR(10) DEFAULT 'EGP',
+        converted TINYINT(1) DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        UNIQUE KEY uq_session (session_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
 
     # App-wide settings table (super-admin configurable)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS app_settings (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            setting_key VARCHAR(100) UNIQUE NOT NULL,
-            setting_value TEXT,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            INDEX idx_key (setting_key)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+    '''
+    CREATE TABLE IF NOT EXISTS app_settings (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        setting_key VARCHAR(100) UNIQUE NOT NULL,
+        setting_value TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        INDEX idx_key (setting_key)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
+
+    # ── Consumable Bundles (per clinic) ─────────────────────────────
+    # A bundle is a named, reusable group of consumables with
+    # per-case quantities. Picking a bundle in a service modal
+    # bulk-adds its items as service_consumables rows (snapshot,
+    # not a live link — see RESPONSIVENESS_PLAN bundles section).
+    '''
+    CREATE TABLE IF NOT EXISTS bundles (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        clinic_id INT NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        name_ar VARCHAR(255),
+        description TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        FOREIGN KEY (clinic_id) REFERENCES clinics(id) ON DELETE CASCADE,
+        UNIQUE KEY uq_clinic_name (clinic_id, name),
+        INDEX idx_clinic (clinic_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
+
+    # ── Bundle items ────────────────────────────────────────────────
+    # One row per consumable in a bundle, with the qty applied when
+    # the bundle is picked. UNIQUE(bundle_id, consumable_id) keeps
+    # each consumable from appearing twice in the same bundle.
+    '''
+    CREATE TABLE IF NOT EXISTS bundle_items (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        bundle_id INT NOT NULL,
+        consumable_id INT NOT NULL,
+        qty_per_case DOUBLE NOT NULL DEFAULT 1,
+        FOREIGN KEY (bundle_id) REFERENCES bundles(id) ON DELETE CASCADE,
+        FOREIGN KEY (consumable_id) REFERENCES consumables(id) ON DELETE CASCADE,
+        UNIQUE KEY uq_bundle_consumable (bundle_id, consumable_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
+
+    # Schema version stamp written at the end of init_database()
+    '''
+    CREATE TABLE IF NOT EXISTS schema_meta (
+        id TINYINT PRIMARY KEY,
+        version INT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    ''',
+)
+
+
+def _schema_version():
+    """Return the schema version stamped in the database, or None if unstamped"""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute('SELECT version FROM schema_meta WHERE id = 1')
+        row = cursor.fetchone()
+        return row['version'] if row else None
+    except pymysql.err.ProgrammingError:
+        # schema_meta does not exist yet (fresh or pre-versioning database)
+        return None
+    finally:
+        conn.close()
+
+
+def init_database():
+    """Initialize database with all tables"""
+    if _schema_version() == SCHEMA_VERSION:
+        return
+
+    # One round trip for every CREATE TABLE. Multi-statement mode is only
+    # enabled on this short-lived connection, never on pooled ones.
+    ddl_conn = pymysql.connect(**_connect_args(), client_flag=CLIENT.MULTI_STATEMENTS)
+    try:
+        with ddl_conn.cursor() as cursor:
+            cursor.execute(';\n'.join(SCHEMA_TABLES))
+            # Read every statement's result so an error in any of them is raised
+            while cursor.nextset():
+                pass
+    finally:
+        ddl_conn.close()
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    # Read every table's columns in one query for the migration checks below
+    schema_columns = _get_schema_columns(cursor)
+
+    # Column migrations: every table's missing columns go into a single
+    # ALTER TABLE, since each ALTER rebuilds the table and commits on its own
+    # (MySQL DDL cannot be grouped into one transaction)
+
+    # Add current_price, doctor fee type, category and Arabic name columns to services
+    _add_missing_columns(cursor, 'services', schema_columns['services'], [
+        ('current_price', 'DOUBLE'),
+        ('doctor_fee_type', "VARCHAR(50) DEFAULT 'hourly'"),
+        ('doctor_fixed_fee', 'DOUBLE DEFAULT 0'),
+        ('doctor_percentage', 'DOUBLE DEFAULT 0'),
+        ('category_id', 'INT'),
+        ('name_ar', 'VARCHAR(255)'),
+    ])
 
     # Initialize default contact settings if they don't exist
     try:
-        cursor.execute('SELECT COUNT(*) as cnt FROM app_settings WHERE setting_key LIKE %s', ('contact_%',))
-        result = cursor.fetchone()
-        if result and result['cnt'] == 0:
+        cursor.execute('SELECT 1 FROM app_settings WHERE setting_key LIKE %s LIMIT 1', ('contact_%',))
+        if cursor.fetchone() is None:
             cursor.execute('''
                 INSERT INTO app_settings (setting_key, setting_value) VALUES
                 ('contact_email', 'support@example.com'),
@@ -443,17 +780,14 @@ def init_database():
         print(f"Warning: Could not initialize contact settings: {e}")
         # Continue anyway - settings can be added later via super admin panel
 
-    # Migration: Add is_super_admin to users if it doesn't exist
-    user_columns = _get_table_columns(cursor, 'users')
-    if 'is_super_admin' not in user_columns:
-        cursor.execute('ALTER TABLE users ADD COLUMN is_super_admin TINYINT(1) DEFAULT 0')
-
-    # Migration: Add email_verified to users if it doesn't exist
-    if 'email_verified' not in user_columns:
-        cursor.execute('ALTER TABLE users ADD COLUMN email_verified TINYINT(1) DEFAULT 1')  # Default 1 for existing users
+    # Migration: Add is_super_admin and email_verified to users if they don't exist
+    _add_missing_columns(cursor, 'users', schema_columns['users'], [
+        ('is_super_admin', 'TINYINT(1) DEFAULT 0'),
+        ('email_verified', 'TINYINT(1) DEFAULT 1'),  # Default 1 for existing users
+    ])
 
     # Migration: Update password_reset_tokens table to use token_hash instead of token
-    prt_columns = _get_table_columns(cursor, 'password_reset_tokens')
+    prt_columns = schema_columns['password_reset_tokens']
     if 'token' in prt_columns and 'token_hash' not in prt_columns:
         # Drop old table and recreate with new schema
         cursor.execute('DROP TABLE IF EXISTS password_reset_tokens')
@@ -470,80 +804,61 @@ def init_database():
         ''')
 
     # Migration: Add subscription fields to clinics if they don't exist
-    clinic_columns = _get_table_columns(cursor, 'clinics')
-    if 'last_payment_date' not in clinic_columns:
-        cursor.execute('ALTER TABLE clinics ADD COLUMN last_payment_date DATE')
-    if 'last_payment_amount' not in clinic_columns:
-        cursor.execute('ALTER TABLE clinics ADD COLUMN last_payment_amount DOUBLE')
-    if 'grace_period_start' not in clinic_columns:
-        cursor.execute('ALTER TABLE clinics ADD COLUMN grace_period_start DATE')
-    if 'language' not in clinic_columns:
-        cursor.execute("ALTER TABLE clinics ADD COLUMN language VARCHAR(50) DEFAULT 'en'")
-    if 'onboarding_completed' not in clinic_columns:
-        cursor.execute('ALTER TABLE clinics ADD COLUMN onboarding_completed TINYINT(1) DEFAULT 0')
-    if 'province' not in clinic_columns:
-        cursor.execute('ALTER TABLE clinics ADD COLUMN province VARCHAR(255)')
-
-    # Add name_ar column to services table
-    service_columns = _get_table_columns(cursor, 'services')
-    if 'name_ar' not in service_columns:
-        cursor.execute('ALTER TABLE services ADD COLUMN name_ar VARCHAR(255)')
+    _add_missing_columns(cursor, 'clinics', schema_columns['clinics'], [
+        ('last_payment_date', 'DATE'),
+        ('last_payment_amount', 'DOUBLE'),
+        ('grace_period_start', 'DATE'),
+        ('language', "VARCHAR(50) DEFAULT 'en'"),
+        ('onboarding_completed', 'TINYINT(1) DEFAULT 0'),
+        ('province', 'VARCHAR(255)'),
+    ])
 
     # Add name_ar column to consumables table
-    consumable_columns = _get_table_columns(cursor, 'consumables')
-    if 'name_ar' not in consumable_columns:
-        cursor.execute('ALTER TABLE consumables ADD COLUMN name_ar VARCHAR(255)')
+    _add_missing_columns(cursor, 'consumables', schema_columns['consumables'], [
+        ('name_ar', 'VARCHAR(255)'),
+    ])
 
     # Add custom_unit_price column to service_consumables table (for service-specific pricing)
-    sc_columns = _get_table_columns(cursor, 'service_consumables')
-    if 'custom_unit_price' not in sc_columns:
-        cursor.execute('ALTER TABLE service_consumables ADD COLUMN custom_unit_price DOUBLE')
+    _add_missing_columns(cursor, 'service_consumables', schema_columns['service_consumables'], [
+        ('custom_unit_price', 'DOUBLE'),
+    ])
+
+    # Cluster service_consumables by service: every read and the delete-and-
+    # reinsert in update_service_consumables() go by service_id, so keying the
+    # rows on (service_id, id) keeps a service's consumables on the same pages
+    if 'idx_id' not in _get_table_indexes(cursor, 'service_consumables'):
+        cursor.execute('''
+            ALTER TABLE service_consumables
+                DROP PRIMARY KEY,
+                ADD PRIMARY KEY (service_id, id),
+                ADD KEY idx_id (id)
+        ''')
 
     # Add lab_name column to lab_materials table
-    material_columns = _get_table_columns(cursor, 'lab_materials')
-    if 'lab_name' not in material_columns:
-        cursor.execute('ALTER TABLE lab_materials ADD COLUMN lab_name VARCHAR(255)')
+    _add_missing_columns(cursor, 'lab_materials', schema_columns['lab_materials'], [
+        ('lab_name', 'VARCHAR(255)'),
+    ])
 
     # Add custom_unit_price column to service_materials table (for service-specific pricing)
-    sm_columns = _get_table_columns(cursor, 'service_materials')
-    if 'custom_unit_price' not in sm_columns:
-        cursor.execute('ALTER TABLE service_materials ADD COLUMN custom_unit_price DOUBLE')
+    _add_missing_columns(cursor, 'service_materials', schema_columns['service_materials'], [
+        ('custom_unit_price', 'DOUBLE'),
+    ])
+
+    # Indexes for lookups that are not covered by a key: login and password
+    # reset search users by username or email alone, and categories are
+    # listed per clinic in display order
+    user_indexes = _get_table_indexes(cursor, 'users')
+    if 'idx_username' not in user_indexes:
+        cursor.execute('ALTER TABLE users ADD INDEX idx_username (username)')
+    if 'idx_email' not in user_indexes:
+        cursor.execute('ALTER TABLE users ADD INDEX idx_email (email)')
+    if 'idx_clinic_order' not in _get_table_indexes(cursor, 'service_categories'):
+        cursor.execute('ALTER TABLE service_categories ADD INDEX idx_clinic_order (clinic_id, display_order)')
 
-    # ── Consumable Bundles (per clinic) ─────────────────────────────
-    # A bundle is a named, reusable group of consumables with
-    # per-case quantities. Picking a bundle in a service modal
-    # bulk-adds its items as service_consumables rows (snapshot,
-    # not a live link — see RESPONSIVENESS_PLAN bundles section).
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS bundles (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            clinic_id INT NOT NULL,
-            name VARCHAR(255) NOT NULL,
-            name_ar VARCHAR(255),
-            description TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            FOREIGN KEY (clinic_id) REFERENCES clinics(id) ON DELETE CASCADE,
-            UNIQUE KEY uq_clinic_name (clinic_id, name),
-            INDEX idx_clinic (clinic_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
-
-    # ── Bundle items ────────────────────────────────────────────────
-    # One row per consumable in a bundle, with the qty applied when
-    # the bundle is picked. UNIQUE(bundle_id, consumable_id) keeps
-    # each consumable from appearing twice in the same bundle.
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS bundle_items (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            bundle_id INT NOT NULL,
-            consumable_id INT NOT NULL,
-            qty_per_case DOUBLE NOT NULL DEFAULT 1,
-            FOREIGN KEY (bundle_id) REFERENCES bundles(id) ON DELETE CASCADE,
-            FOREIGN KEY (consumable_id) REFERENCES consumables(id) ON DELETE CASCADE,
-            UNIQUE KEY uq_bundle_consumable (bundle_id, consumable_id)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
-    ''')
+        INSERT INTO schema_meta (id, version) VALUES (1, %s)
+        ON DUPLICATE KEY UPDATE version = %s
+    ''', (SCHEMA_VERSION, SCHEMA_VERSION))
 
     conn.commit()
     conn.close()
@@ -565,606 +880,634 @@ DEFAULT_SERVICE_CATEGORIES = [
 
 def create_default_categories(clinic_id, conn=None):
     """Create default service categories for a clinic"""
-    close_conn = False
-    if conn is None:
-        conn = get_connection()
-        close_conn = True
-
-    cursor = conn.cursor()
-
-    # Check if categories already exist for this clinic
-    cursor.execute('SELECT COUNT(*) as cnt FROM service_categories WHERE clinic_id = %s', (clinic_id,))
-    if cursor.fetchone()['cnt'] > 0:
-        if close_conn:
-            conn.close()
-        return
-
-    # Create default categories
-    for order, name in enumerate(DEFAULT_SERVICE_CATEGORIES):
-        cursor.execute('''
-            INSERT INTO service_categories (clinic_id, name, display_order)
-            VALUES (%s, %s, %s)
-        ''', (clinic_id, name, order))
+    with scoped_connection(conn) as conn:
+        cursor = conn.cursor()
+
+        # Check if categories already exist for this clinic
+        cursor.execute('SELECT 1 FROM service_categories WHERE clinic_id = %s LIMIT 1', (clinic_id,))
+        if cursor.fetchone() is not None:
+            return
+
+        # Create default categories in a single multi-row INSERT
+        categories = ((clinic_id, name, order) for order, name in enumerate(DEFAULT_SERVICE_CATEGORIES))
+        _bulk_insert(cursor, 'service_categories', ('clinic_id', 'name', 'display_order'), categories)
+
+
+# ===== 10 ESSENTIAL DENTAL CONSUMABLES =====
+# (item_name, pack_cost, cases_per_pack, units_per_case, name_ar)
+_STARTER_CONSUMABLES = (
+    ('Nitrile Gloves (Box of 100)', 0, 1, 100, 'قفازات نيتريل (علبة 100)'),
+    ('Anesthetic Cartridge (Lidocaine)', 0, 1, 50, 'كارتريدج مخدر (ليدوكايين)'),
+    ('Composite Resin A2 (4g)', 0, 1, 1, 'كومبوزيت راتنج A2 (4 جرام)'),
+    ('Bonding Agent (5ml)', 0, 1, 40, 'مادة لاصقة (5 مل)'),
+    ('Etch Gel 37% (3ml)', 0, 1, 15, 'جل إتش 37% (3 مل)'),
+    ('Cotton Rolls (Pack of 1000)', 0, 1, 1000, 'لفات قطن (عبوة 1000)'),
+    ('Gauze 2x2 (Pack of 200)', 0, 1, 200, 'شاش 2×2 (عبوة 200)'),
+    ('Diamond Bur (Pack of 5)', 0, 1, 5, 'سنبلة ماسية (عبوة 5)'),
+    ('Disposable Bib', 0, 1, 100, 'مريلة للاستعمال مرة واحدة'),
+    ('Temporary Filling Material', 0, 1, 25, 'مادة حشو مؤقت'),
+)
+
+
+# ===== 5 COMMON LAB MATERIALS =====
+# (material_name, lab_name, unit_cost, description, name_ar)
+_STARTER_LAB_MATERIALS = (
+    ('Zirconia Crown', 'Premium Dental Lab', 0, 'High-quality ceramic crown', 'تاج زركونيا'),
+    ('PFM Crown', 'Premium Dental Lab', 0, 'Porcelain-fused-to-metal crown', 'تاج بورسلين على معدن'),
+    ('Porcelain Veneer', 'Elite Ceramics Lab', 0, 'Thin ceramic veneer', 'قشرة بورسلين'),
+    ('Full Denture (Acrylic)', 'Prosthetics Lab', 0, 'Complete denture set', 'طقم أسنان كامل (أكريليك)'),
+    ('Night Guard', 'Appliance Lab', 0, 'Custom occlusal guard', 'واقي ليلي'),
+)
+
+
+# ===== 3 FIXED MONTHLY COSTS =====
+# (category, monthly_amount, included, notes)
+_STARTER_FIXED_COSTS = (
+    ('Rent', 0, 1, 'Monthly clinic rent / إيجار العيادة الشهري'),
+    ('Utilities (Electricity/Water/Internet)', 0, 1, 'Base utility costs / تكاليف المرافق الأساسية'),
+    ('Insurance & Admin', 0, 1, 'Insurance and administrative expenses / التأمين والمصاريف الإدارية'),
+)
+
+
+# ===== 3 EQUIPMENT ITEMS (DEPRECIATION) =====
+# (asset_name, purchase_cost, life_years, allocation_type, monthly_usage_hours)
+_STARTER_EQUIPMENT = (
+    ('Dental Chair / كرسي الأسنان', 0, 10, 'fixed', None),
+    ('Autoclave Sterilizer / جهاز التعقيم', 0, 7, 'fixed', None),
+    ('Dental X-Ray Unit / جهاز أشعة الأسنان', 0, 8, 'per-hour', 40),
+    ('Finishing & Decorations / التشطيبات والديكورات', 0, 10, 'fixed', None),
+    ('Furniture / الأثاث', 0, 7, 'fixed', None),
+    ('Intraoral Scanner / ماسح داخل الفم', 0, 5, 'per-hour', 20),
+    ('Light Cure Unit / جهاز التثبيت الضوئي', 0, 5, 'fixed', None),
+    ('Rotary Endo Motor / موتور علاج الجذور الدوار', 0, 5, 'per-hour', 15),
+    ('Implant Motor / موتور الزراعة السنية', 0, 7, 'per-hour', 10),
+)
+
+
+# ===== 3 STAFF SALARIES =====
+# (role_name, monthly_salary, included, notes)
+_STARTER_SALARIES = (
+    ('Receptionist / موظف استقبال', 0, 1, 'Front desk staff'),
+    ('Dental Assistant / مساعد طبيب أسنان', 0, 1, 'Clinical assistant'),
+    ('Cleaner / عامل نظافة', 0, 1, 'Facility maintenance'),
+)
+
+
+# ===== 5 MAIN DENTAL SERVICES =====
+# (name, chair_time_hours, doctor_hourly_fee, use_default_profit, custom_profit_percent, current_price, name_ar)
+_STARTER_SERVICES = (
+    ('Dental Checkup & Cleaning', 0.75, 0, 1, None, 0, 'فحص وتنظيف الأسنان'),
+    ('Composite Filling', 0.75, 0, 1, None, 0, 'حشو كومبوزيت'),
+    ('Root Canal Treatment', 2.0, 0, 1, None, 0, 'علاج عصب'),
+    ('Zirconia Crown', 2.0, 0, 1, None, 0, 'تاج زركونيا'),
+    ('Teeth Whitening', 1.5, 0, 1, None, 0, 'تبييض الأسنان'),
+)
+
+
+# ===== SERVICE-CONSUMABLE RELATIONSHIPS =====
+# Map consumables: [0]=Gloves, [1]=Anesthetic, [2]=Composite, [3]=Bonding, [4]=Etch,
+# [5]=Cotton, [6]=Gauze, [7]=Bur, [8]=Bib, [9]=TempFill
+# (service index, consumable index, quantity)
+_STARTER_CONSUMABLE_LINKS = (
+    # Service 1: Checkup & Cleaning (uses gloves, cotton, gauze, bib)
+    (0, 0, 4),    # 4 gloves
+    (0, 5, 10),   # 10 cotton rolls
+    (0, 6, 5),    # 5 gauze
+    (0, 8, 1),    # 1 bib
 
-    conn.commit()
-    if close_conn:
-        conn.close()
+    # Service 2: Composite Filling (uses gloves, anesthetic, composite, bonding, etch, cotton, bur, bib)
+    (1, 0, 4),    # 4 gloves
+    (1, 1, 1),    # 1 anesthetic
+    (1, 2, 0.4),  # 0.4 composite syringe
+    (1, 3, 1),    # 1 bonding
+    (1, 4, 1),    # 1 etch
+    (1, 5, 8),    # 8 cotton rolls
+    (1, 7, 1),    # 1 bur
+    (1, 8, 1),    # 1 bib
 
+    # Service 3: Root Canal (uses gloves, anesthetic, cotton, gauze, bib, temp fill)
+    (2, 0, 6),    # 6 gloves
+    (2, 1, 2),    # 2 anesthetic
+    (2, 5, 20),   # 20 cotton rolls
+    (2, 6, 10),   # 10 gauze
+    (2, 8, 1),    # 1 bib
+    (2, 9, 1),    # 1 temp fill
 
-def create_clinic_starter_data(clinic_id, conn=None):
-    """
-    Create comprehensive starter data for a new clinic.
-    Includes: 10 consumables, 5 lab materials, 3 fixed costs, 3 equipment, 3 salaries, 5 services
-    All items include Arabic translations.
-    """
-    close_conn = False
-    if conn is None:
-        conn = get_connection()
-        close_conn = True
+    # Service 4: Zirconia Crown (uses gloves, anesthetic, bur, bib, temp fill)
+    (3, 0, 6),    # 6 gloves
+    (3, 1, 2),    # 2 anesthetic
+    (3, 7, 3),    # 3 burs
+    (3, 8, 1),    # 1 bib
+    (3, 9, 1),    # 1 temp fill
 
-    cursor = conn.cursor()
+    # Service 5: Teeth Whitening (uses gloves, bib)
+    (4, 0, 4),    # 4 gloves
+    (4, 8, 1),    # 1 bib
+)
 
-    # Check if starter data already exists for this clinic (check consumables as indicator)
-    cursor.execute("SELECT COUNT(*) as cnt FROM consumables WHERE clinic_id = %s", (clinic_id,))
-    if cursor.fetchone()['cnt'] > 0:
-        if close_conn:
-            conn.close()
-        return
 
-    print(f"📦 Creating starter data for clinic {clinic_id}...")
-
-    # ===== 10 ESSENTIAL DENTAL CONSUMABLES =====
-    # (clinic_id, item_name, pack_cost, cases_per_pack, units_per_case, name_ar)
-    consumables = [
-        (clinic_id, 'Nitrile Gloves (Box of 100)', 0, 1, 100, 'قفازات نيتريل (علبة 100)'),
-        (clinic_id, 'Anesthetic Cartridge (Lidocaine)', 0, 1, 50, 'كارتريدج مخدر (ليدوكايين)'),
-        (clinic_id, 'Composite Resin A2 (4g)', 0, 1, 1, 'كومبوزيت راتنج A2 (4 جرام)'),
-        (clinic_id, 'Bonding Agent (5ml)', 0, 1, 40, 'مادة لاصقة (5 مل)'),
-        (clinic_id, 'Etch Gel 37% (3ml)', 0, 1, 15, 'جل إتش 37% (3 مل)'),
-        (clinic_id, 'Cotton Rolls (Pack of 1000)', 0, 1, 1000, 'لفات قطن (عبوة 1000)'),
-        (clinic_id, 'Gauze 2x2 (Pack of 200)', 0, 1, 200, 'شاش 2×2 (عبوة 200)'),
-        (clinic_id, 'Diamond Bur (Pack of 5)', 0, 1, 5, 'سنبلة ماسية (عبوة 5)'),
-        (clinic_id, 'Disposable Bib', 0, 1, 100, 'مريلة للاستعمال مرة واحدة'),
-        (clinic_id, 'Temporary Filling Material', 0, 1, 25, 'مادة حشو مؤقت'),
-    ]
-    cursor.executemany('''
-        INSERT INTO consumables (clinic_id, item_name, pack_cost, cases_per_pack, units_per_case, name_ar)
-        VALUES (%s, %s, %s, %s, %s, %s)
-    ''', consumables)
-
-    # Get the inserted consumable IDs (they start at the next available ID)
-    cursor.execute("SELECT id FROM consumables WHERE clinic_id = %s ORDER BY id", (clinic_id,))
-    consumable_ids = [row['id'] for row in cursor.fetchall()]
-
-    # ===== 5 COMMON LAB MATERIALS =====
-    # (clinic_id, material_name, lab_name, unit_cost, description, name_ar)
-    materials = [
-        (clinic_id, 'Zirconia Crown', 'Premium Dental Lab', 0, 'High-quality ceramic crown', 'تاج زركونيا'),
-        (clinic_id, 'PFM Crown', 'Premium Dental Lab', 0, 'Porcelain-fused-to-metal crown', 'تاج بورسلين على معدن'),
-        (clinic_id, 'Porcelain Veneer', 'Elite Ceramics Lab', 0, 'Thin ceramic veneer', 'قشرة بورسلين'),
-        (clinic_id, 'Full Denture (Acrylic)', 'Prosthetics Lab', 0, 'Complete denture set', 'طقم أسنان كامل (أكريليك)'),
-        (clinic_id, 'Night Guard', 'Appliance Lab', 0, 'Custom occlusal guard', 'واقي ليلي'),
-    ]
-    cursor.executemany('''
-        INSERT INTO lab_materials (clinic_id, material_name, lab_name, unit_cost, description, name_ar)
-        VALUES (%s, %s, %s, %s, %s, %s)
-    ''', materials)
-
-    # Get the inserted material IDs
-    cursor.execute("SELECT id FROM lab_materials WHERE clinic_id = %s ORDER BY id", (clinic_id,))
-    material_ids = [row['id'] for row in cursor.fetchall()]
-
-    # ===== 3 FIXED MONTHLY COSTS =====
-    # (clinic_id, category, monthly_amount, included, notes)
-    fixed_costs = [
-        (clinic_id, 'Rent', 0, 1, 'Monthly clinic rent / إيجار العيادة الشهري'),
-        (clinic_id, 'Utilities (Electricity/Water/Internet)', 0, 1, 'Base utility costs / تكاليف المرافق الأساسية'),
-        (clinic_id, 'Insurance & Admin', 0, 1, 'Insurance and administrative expenses / التأمين والمصاريف الإدارية'),
-    ]
-    cursor.executemany('''
-        INSERT INTO fixed_costs (clinic_id, category, monthly_amount, included, notes)
-        VALUES (%s, %s, %s, %s, %s)
-    ''', fixed_costs)
-
-    # ===== 3 EQUIPMENT ITEMS (DEPRECIATION) =====
-    # (clinic_id, asset_name, purchase_cost, life_years, allocation_type, monthly_usage_hours)
-    equipment = [
-        (clinic_id, 'Dental Chair / كرسي الأسنان', 0, 10, 'fixed', None),
-        (clinic_id, 'Autoclave Sterilizer / جهاز التعقيم', 0, 7, 'fixed', None),
-        (clinic_id, 'Dental X-Ray Unit / جهاز أشعة الأسنان', 0, 8, 'per-hour', 40),
-        (clinic_id, 'Finishing & Decorations / التشطيبات والديكورات', 0, 10, 'fixed', None),
-        (clinic_id, 'Furniture / الأثاث', 0, 7, 'fixed', None),
-        (clinic_id, 'Intraoral Scanner / ماسح داخل الفم', 0, 5, 'per-hour', 20),
-        (clinic_id, 'Light Cure Unit / جهاز التثبيت الضوئي', 0, 5, 'fixed', None),
-        (clinic_id, 'Rotary Endo Motor / موتور علاج الجذور الدوار', 0, 5, 'per-hour', 15),
-        (clinic_id, 'Implant Motor / موتور الزراعة السنية', 0, 7, 'per-hour', 10),
-    ]
-    cursor.executemany('''
-        INSERT INTO equipment (clinic_id, asset_name, purchase_cost, life_years, allocation_type, monthly_usage_hours)
-        VALUES (%s, %s, %s, %s, %s, %s)
-    ''', equipment)
-
-    # Get the inserted equipment IDs
-    cursor.execute("SELECT id FROM equipment WHERE clinic_id = %s ORDER BY id", (clinic_id,))
-    equipment_ids = [row['id'] for row in cursor.fetchall()]
-
-    # ===== 3 STAFF SALARIES =====
-    # (clinic_id, role_name, monthly_salary, included, notes)
-    salaries = [
-        (clinic_id, 'Receptionist / موظف استقبال', 0, 1, 'Front desk staff'),
-        (clinic_id, 'Dental Assistant / مساعد طبيب أسنان', 0, 1, 'Clinical assistant'),
-        (clinic_id, 'Cleaner / عامل نظافة', 0, 1, 'Facility maintenance'),
-    ]
-    cursor.executemany('''
-        INSERT INTO salaries (clinic_id, role_name, monthly_salary, included, notes)
-        VALUES (%s, %s, %s, %s, %s)
-    ''', salaries)
-
-    # ===== 5 MAIN DENTAL SERVICES =====
-    # (clinic_id, name, chair_time_hours, doctor_hourly_fee, use_default_profit, custom_profit_percent, current_price, name_ar)
-    services = [
-        (clinic_id, 'Dental Checkup & Cleaning', 0.75, 0, 1, None, 0, 'فحص وتنظيف الأسنان'),
-        (clinic_id, 'Composite Filling', 0.75, 0, 1, None, 0, 'حشو كومبوزيت'),
-        (clinic_id, 'Root Canal Treatment', 2.0, 0, 1, None, 0, 'علاج عصب'),
-        (clinic_id, 'Zirconia Crown', 2.0, 0, 1, None, 0, 'تاج زركونيا'),
-        (clinic_id, 'Teeth Whitening', 1.5, 0, 1, None, 0, 'تبييض الأسنان'),
-    ]
-    cursor.executemany('''
-        INSERT INTO services (clinic_id, name, chair_time_hours, doctor_hourly_fee, use_default_profit, custom_profit_percent, current_price, name_ar)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-    ''', services)
-
-    # Get the inserted service IDs
-    cursor.execute("SELECT id FROM services WHERE clinic_id = %s ORDER BY id", (clinic_id,))
-    service_ids = [row['id'] for row in cursor.fetchall()]
-
-    # ===== SERVICE-CONSUMABLE RELATIONSHIPS =====
-    # Map consumables: [0]=Gloves, [1]=Anesthetic, [2]=Composite, [3]=Bonding, [4]=Etch,
-    # [5]=Cotton, [6]=Gauze, [7]=Bur, [8]=Bib, [9]=TempFill
-
-    service_consumables = []
+# ===== SERVICE-MATERIAL RELATIONSHIPS =====
+# Map materials: [0]=Zirconia Crown, [1]=PFM Crown, [2]=Porcelain Veneer, [3]=Full Denture, [4]=Night Guard
+# (service index, material index, quantity)
+_STARTER_MATERIAL_LINKS = (
+    (3, 0, 1),    # Service 4: Zirconia Crown uses 1 zirconia crown
+)
 
-    # Service 1: Checkup & Cleaning (uses gloves, cotton, gauze, bib)
-    if len(service_ids) > 0 and len(consumable_ids) >= 9:
-        service_consumables.extend([
-            (service_ids[0], consumable_ids[0], 4),   # 4 gloves
-            (service_ids[0], consumable_ids[5], 10),  # 10 cotton rolls
-            (service_ids[0], consumable_ids[6], 5),   # 5 gauze
-            (service_ids[0], consumable_ids[8], 1),   # 1 bib
-        ])
 
-    # Service 2: Composite Filling (uses gloves, anesthetic, composite, bonding, etch, cotton, bur, bib)
-    if len(service_ids) > 1 and len(consumable_ids) >= 9:
-        service_consumables.extend([
-            (service_ids[1], consumable_ids[0], 4),   # 4 gloves
-            (service_ids[1], consumable_ids[1], 1),   # 1 anesthetic
-            (service_ids[1], consumable_ids[2], 0.4), # 0.4 composite syringe
-            (service_ids[1], consumable_ids[3], 1),   # 1 bonding
-            (service_ids[1], consumable_ids[4], 1),   # 1 etch
-            (service_ids[1], consumable_ids[5], 8),   # 8 cotton rolls
-            (service_ids[1], consumable_ids[7], 1),   # 1 bur
-            (service_ids[1], consumable_ids[8], 1),   # 1 bib
-        ])
+# ===== SERVICE-EQUIPMENT RELATIONSHIPS =====
+# Map equipment: [0]=Dental Chair, [1]=Autoclave, [2]=X-Ray Unit
+# (service index, equipment index, hours used)
+_STARTER_EQUIPMENT_LINKS = (
+    (2, 2, 0.25),  # Service 3: Root Canal - 15 min X-ray
+    (3, 2, 0.25),  # Service 4: Zirconia Crown - 15 min X-ray
+)
 
-    # Service 3: Root Canal (uses gloves, anesthetic, cotton, gauze, bib, temp fill)
-    if len(service_ids) > 2 and len(consumable_ids) >= 10:
-        service_consumables.extend([
-            (service_ids[2], consumable_ids[0], 6),   # 6 gloves
-            (service_ids[2], consumable_ids[1], 2),   # 2 anesthetic
-            (service_ids[2], consumable_ids[5], 20),  # 20 cotton rolls
-            (service_ids[2], consumable_ids[6], 10),  # 10 gauze
-            (service_ids[2], consumable_ids[8], 1),   # 1 bib
-            (service_ids[2], consumable_ids[9], 1),   # 1 temp fill
-        ])
 
-    # Service 4: Zirconia Crown (uses gloves, anesthetic, bur, bib, temp fill)
-    if len(service_ids) > 3 and len(consumable_ids) >= 10:
-        service_consumables.extend([
-            (service_ids[3], consumable_ids[0], 6),   # 6 gloves
-            (service_ids[3], consumable_ids[1], 2),   # 2 anesthetic
-            (service_ids[3], consumable_ids[7], 3),   # 3 burs
-            (service_ids[3], consumable_ids[8], 1),   # 1 bib
-            (service_ids[3], consumable_ids[9], 1),   # 1 temp fill
-        ])
+def _latest_ids(cursor, table, clinic_id, count):
+    """Ids of the `count` most recent rows of a clinic's table, oldest first"""
+    cursor.execute(f"SELECT id FROM {table} WHERE clinic_id = %s ORDER BY id DESC LIMIT %s",
+                   (clinic_id, count))
+    return [row['id'] for row in reversed(cursor.fetchall())]
 
-    # Service 5: Teeth Whitening (uses gloves, bib)
-    if len(service_ids) > 4 and len(consumable_ids) >= 9:
-        service_consumables.extend([
-            (service_ids[4], consumable_ids[0], 4),   # 4 gloves
-            (service_ids[4], consumable_ids[8], 1),   # 1 bib
-        ])
 
-    if service_consumables:
-        cursor.executemany('''
-            INSERT INTO service_consumables (service_id, consumable_id, quantity)
-            VALUES (%s, %s, %s)
-        ''', service_consumables)
+def _seed_clinic_rows(cursor, table, columns, clinic_id, rows, return_ids=False):
+    """Bulk insert seed rows for a clinic, prefixing each with clinic_id
 
-    # ===== SERVICE-MATERIAL RELATIONSHIPS =====
-    # Map materials: [0]=Zirconia Crown, [1]=PFM Crown, [2]=Porcelain Veneer, [3]=Full Denture, [4]=Night Guard
+    With return_ids, returns the new rows' ids in insertion order.
+    """
+    _bulk_insert(cursor, table, ('clinic_id', *columns), ((clinic_id, *row) for row in rows))
+    if return_ids:
+        return _latest_ids(cursor, table, clinic_id, len(rows))
 
-    service_materials = []
 
-    # Service 4: Zirconia Crown (uses Zirconia Crown lab material)
-    if len(service_ids) > 3 and len(material_ids) >= 1:
-        service_materials.append((service_ids[3], material_ids[0], 1))  # 1 zirconia crown
+def create_clinic_starter_data(clinic_id, conn=None):
+    """
+    Create comprehensive starter data for a new clinic.
+    Includes: 10 consumables, 5 lab materials, 3 fixed costs, 3 equipment, 3 salaries, 5 services
+    All items include Arabic translations.
+    """
+    with scoped_connection(conn) as conn:
+        cursor = conn.cursor()
 
-    if service_materials:
-        cursor.executemany('''
-            INSERT INTO service_materials (service_id, material_id, quantity)
-            VALUES (%s, %s, %s)
-        ''', service_materials)
+        # Check if starter data already exists for this clinic (check consumables as indicator)
+        cursor.execute("SELECT 1 FROM consumables WHERE clinic_id = %s LIMIT 1", (clinic_id,))
+        if cursor.fetchone() is not None:
+            return
 
-    # ===== SERVICE-EQUIPMENT RELATIONSHIPS =====
-    # Map equipment: [0]=Dental Chair, [1]=Autoclave, [2]=X-Ray Unit
+        print(f"📦 Creating starter data for clinic {clinic_id}...")
 
-    service_equipment = []
+        consumable_ids = _seed_clinic_rows(cursor, 'consumables', ('item_name', 'pack_cost', 'cases_per_pack', 'units_per_case', 'name_ar'),
+                                           clinic_id, _STARTER_CONSUMABLES, return_ids=True)
+        material_ids = _seed_clinic_rows(cursor, 'lab_materials', ('material_name', 'lab_name', 'unit_cost', 'description', 'name_ar'),
+                                         clinic_id, _STARTER_LAB_MATERIALS, return_ids=True)
+        _seed_clinic_rows(cursor, 'fixed_costs', ('category', 'monthly_amount', 'included', 'notes'),
+                          clinic_id, _STARTER_FIXED_COSTS)
+        equipment_ids = _seed_clinic_rows(cursor, 'equipment', ('asset_name', 'purchase_cost', 'life_years', 'allocation_type', 'monthly_usage_hours'),
+                                          clinic_id, _STARTER_EQUIPMENT, return_ids=True)
+        _seed_clinic_rows(cursor, 'salaries', ('role_name', 'monthly_salary', 'included', 'notes'),
+                          clinic_id, _STARTER_SALARIES)
+        service_ids = _seed_clinic_rows(cursor, 'services', ('name', 'chair_time_hours', 'doctor_hourly_fee', 'use_default_profit', 'custom_profit_percent', 'current_price', 'name_ar'),
+                                        clinic_id, _STARTER_SERVICES, return_ids=True)
 
-    # Service 3: Root Canal (uses X-Ray)
-    if len(service_ids) > 2 and len(equipment_ids) >= 3:
-        service_equipment.append((service_ids[2], equipment_ids[2], 0.25))  # 15 min X-ray for root canal
+        # Hoist the id-list lengths once; each link below is skipped if an index is missing
+        ns, nc, nm, ne = len(service_ids), len(consumable_ids), len(material_ids), len(equipment_ids)
 
-    # Service 4: Zirconia Crown (uses X-Ray)
-    if len(service_ids) > 3 and len(equipment_ids) >= 3:
-        service_equipment.append((service_ids[3], equipment_ids[2], 0.25))  # 15 min X-ray for crown
+        service_consumables = ((service_ids[si], consumable_ids[ci], qty)
+                               for si, ci, qty in _STARTER_CONSUMABLE_LINKS if si < ns and ci < nc)
 
-    if service_equipment:
-        cursor.executemany('''
-            INSERT INTO service_equipment (service_id, equipment_id, hours_used)
-            VALUES (%s, %s, %s)
-        ''', service_equipment)
+        _bulk_insert(cursor, 'service_consumables', ('service_id', 'consumable_id', 'quantity'), service_consumables)
 
-    conn.commit()
-    if close_conn:
-        conn.close()
+        service_materials = ((service_ids[si], material_ids[mi], qty)
+                             for si, mi, qty in _STARTER_MATERIAL_LINKS if si < ns and mi < nm)
 
-    print(f"✅ Starter data created for clinic {clinic_id}!")
+        _bulk_insert(cursor, 'service_materials', ('service_id', 'material_id', 'quantity'), service_materials)
 
+        service_equipment = ((service_ids[si], equipment_ids[ei], hours)
+                             for si, ei, hours in _STARTER_EQUIPMENT_LINKS if si < ns and ei < ne)
 
-def create_initial_admin():
-    """Create initial demo clinic and admin user if no clinics exist"""
-    conn = get_connection()
-    cursor = conn.cursor()
+        _bulk_insert(cursor, 'service_equipment', ('service_id', 'equipment_id', 'hours_used'), service_equipment)
 
-    cursor.execute("SELECT COUNT(*) as cnt FROM clinics")
-    if cursor.fetchone()['cnt'] > 0:
-        conn.close()
-        return
+        print(f"✅ Starter data created for clinic {clinic_id}!")
 
-    print("\n" + "="*60)
-    print("  DENTAL CALCULATOR - Initial Setup")
-    print("="*60)
-    print("\n⚠️  Creating demo clinic and admin account...")
-    print("\n📝 Login Credentials:")
-    print("   Username: admin")
-    print("   Password: 12345")
-    print("\n🔐 Please change this password after first login!")
-    print("="*60 + "\n")
-
-    # Create demo clinic (super admin clinic - always active)
-    cursor.execute('''
-        INSERT INTO clinics (name, slug, email, phone, address, city, country, subscription_plan, subscription_status, max_users, max_services)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    ''', ('Demo Dental Clinic', 'demo-clinic', 'demo@dentalcalc.local', '+20 100 000 0000',
-          '123 Demo Street', 'Cairo', 'Egypt', 'professional', 'active', 10, 100))
-    clinic_id = cursor.lastrowid
-
-    # Create admin user for demo clinic (this is the super admin)
-    admin_hash = hash_password('12345')
-    cursor.execute('''
-        INSERT INTO users (clinic_id, username, password_hash, first_name, last_name, email, role, is_super_admin)
-        VALUES (%s, %s, %s, 'Admin', 'User', 'admin@dentalcalc.local', 'owner', 1)
-    ''', (clinic_id, 'admin', admin_hash))
 
-    # Create default settings for demo clinic
-    cursor.execute('''
-        INSERT INTO global_settings (clinic_id, currency, vat_percent, default_profit_percent, rounding_nearest)
-        VALUES (%s, 'EGP', 0, 40, 5)
-    ''', (clinic_id,))
+# hash_password('12345') computed once; the demo password is public anyway and
+# is upgraded like any other hash if the scrypt parameters ever change
+DEMO_ADMIN_PASSWORD_HASH = '$scrypt$ln=15,r=8,p=1$mzawhlxqAn4WVTdmqQJI6A$69/fQgQV3yWFU0MP+u2+cMuDt80PlGo/dTo+FCHx68M'
 
-    # Create default clinic capacity
-    cursor.execute('''
-        INSERT INTO clinic_capacity (clinic_id, chairs, days_per_month, hours_per_day, utilization_percent)
-        VALUES (%s, 1, 24, 8, 80)
-    ''', (clinic_id,))
+_INITIAL_ADMIN_BANNER = (
+    "\n" + "=" * 60 + "\n"
+    "  DENTAL CALCULATOR - Initial Setup\n"
+    + "=" * 60 + "\n"
+    "\n⚠️  Created demo clinic and admin account\n"
+    "\n📝 Login Credentials:\n"
+    "   Username: admin\n"
+    "   Password: 12345\n"
+    "\n🔐 Please change this password after first login!\n"
+    + "=" * 60 + "\n\n"
+)
 
-    # Create default service categories
-    create_default_categories(clinic_id, conn)
 
-    # Create starter data (consumables, materials, equipment, salaries, services)
-    create_clinic_starter_data(clinic_id, conn)
+def create_initial_admin(conn=None):
+    """Create initial demo clinic and admin user if no clinics exist"""
+    # One connection (and one transaction) spans the clinic and all of its seed data
+    with scoped_connection(conn) as conn:
+        cursor = conn.cursor()
 
-    conn.commit()
-    conn.close()
+        # Create demo clinic (super admin clinic - always active). The NOT EXISTS
+        # guard folds the "any clinics yet?" check into the insert itself.
+        cursor.execute('''
+            INSERT INTO clinics (name, slug, email, phone, address, city, country, subscription_plan, subscription_status, max_users, max_services)
+            SELECT %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s FROM DUAL
+            WHERE NOT EXISTS (SELECT 1 FROM clinics)
+        ''', ('Demo Dental Clinic', 'demo-clinic', 'demo@dentalcalc.local', '+20 100 000 0000',
+              '123 Demo Street', 'Cairo', 'Egypt', 'professional', 'active', 10, 100))
+        if cursor.rowcount == 0:
+            return
+        clinic_id = cursor.lastrowid
+
+        # Create admin user for demo clinic (this is the super admin)
+        admin_hash = DEMO_ADMIN_PASSWORD_HASH
+        cursor.execute('''
+            INSERT INTO users (clinic_id, username, password_hash, first_name, last_name, email, role, is_super_admin)
+            VALUES (%s, %s, %s, 'Admin', 'User', 'admin@dentalcalc.local', 'owner', 1)
+        ''', (clinic_id, 'admin', admin_hash))
 
+        # Create default settings for demo clinic
+        cursor.execute('''
+            INSERT INTO global_settings (clinic_id, currency, vat_percent, default_profit_percent, rounding_nearest)
+            VALUES (%s, 'EGP', 0, 40, 5)
+        ''', (clinic_id,))
 
-def create_sample_data():
-    """Create sample data for demonstration"""
+        # Create default clinic capacity
+        cursor.execute('''
+            INSERT INTO clinic_capacity (clinic_id, chairs, days_per_month, hours_per_day, utilization_percent)
+            VALUES (%s, 1, 24, 8, 80)
+        ''', (clinic_id,))
+
+        # Create default service categories
+        create_default_categories(clinic_id, conn)
+
+        # Create starter data (consumables, materials, equipment, salaries, services)
+        create_clinic_starter_data(clinic_id, conn)
+
+    # Announce the credentials in one write, once the seed transaction is done
+    sys.stdout.write(_INITIAL_ADMIN_BANNER)
+
+
+# Fixed Costs
+_SAMPLE_FIXED_COSTS = (
+    ('Rent', 20000, 1, 'Monthly clinic rent'),
+    ('Utilities (electricity/water/internet)', 2500, 1, 'Base costs'),
+    ('Admin/Marketing', 3000, 1, 'Administrative expenses'),
+    ('Insurance', 0, 0, 'Optional'),
+    ('Software/Subscriptions', 800, 1, 'Management software'),
+    ('Cleaning/Laundry', 600, 1, 'Maintenance'),
+    ('Miscellaneous Buffer', 500, 1, 'Unexpected costs'),
+)
+
+
+# Salaries
+_SAMPLE_SALARIES = (
+    ('Receptionist', 8000, 1, 'Front desk'),
+    ('Assistant 1', 12000, 1, 'Clinical assistant'),
+    ('Assistant 2', 12000, 1, 'Clinical assistant'),
+    ('Cleaner', 4000, 1, 'Facility maintenance'),
+)
+
+
+# Equipment
+_SAMPLE_EQUIPMENT = (
+    ('Dental Chair', 100000, 10, 'fixed', None),
+    ('CBCT Machine', 800000, 8, 'fixed', None),
+    ('Intraoral Scanner', 250000, 7, 'per-hour', 30),
+    ('Laser Unit', 120000, 5, 'per-hour', 20),
+)
+
+
+# Consumables (item_name, pack_cost, cases_per_pack, units_per_case)
+# Realistic dental consumable pricing
+_SAMPLE_CONSUMABLES = (
+    ('Nitrile Gloves (Box of 100)', 180, 1, 100),  # EGP 1.80 per pair
+    ('Anesthetic Cartridge (Lidocaine 2%)', 850, 1, 50),  # EGP 17 per cartridge
+    ('Composite Resin A2 (4g syringe)', 1200, 1, 1),  # EGP 1200 per syringe
+    ('Bonding Agent (5ml bottle)', 900, 1, 40),  # ~EGP 22.50 per application
+    ('Etch Gel 37% (3ml syringe)', 120, 1, 15),  # EGP 8 per application
+    ('Cotton Rolls (Pack of 1000)', 250, 1, 1000),  # EGP 0.25 each
+    ('Gauze 2x2 (Pack of 200)', 180, 1, 200),  # EGP 0.90 each
+    ('Suture 3-0 Silk', 75, 1, 1),  # EGP 75 per suture
+    ('Diamond Bur (Pack of 5)', 350, 1, 5),  # EGP 70 per bur
+    ('Temporary Filling (Cavit)', 280, 1, 25),  # EGP 11.20 per application
+    ('Disposable Bib', 200, 1, 100),  # EGP 2 each
+    ('Zirconia Crown (Lab)', 3500, 1, 1),  # EGP 3500 per crown
+    ('PFM Crown (Lab)', 2200, 1, 1),  # EGP 2200 per crown
+    ('Implant Fixture (Korean)', 8500, 1, 1),  # EGP 8500 per implant
+    ('Implant Abutment', 2500, 1, 1),  # EGP 2500 per abutment
+    ('Gutta Percha Points (Pack)', 450, 1, 120),  # EGP 3.75 each
+    ('Endodontic File (Pack of 6)', 280, 1, 6),  # EGP 46.67 each
+    ('Impression Material (Heavy Body)', 650, 1, 10),  # EGP 65 per impression
+    ('Alginate (450g bag)', 180, 1, 15),  # EGP 12 per impression
+    ('Whitening Gel (Syringe)', 450, 1, 3),  # EGP 150 per session
+)
+
+
+# Lab Materials (material_name, lab_name, unit_cost, description)
+# Materials from labs with direct per-unit pricing
+_SAMPLE_LAB_MATERIALS = (
+    # Premium Dental Lab - Crowns & Bridges
+    ('Zirconia Crown', 'Premium Dental Lab', 3500, 'High-quality ceramic crown'),
+    ('PFM Crown', 'Premium Dental Lab', 2200, 'Porcelain-fused-to-metal crown'),
+    ('Emax Crown', 'Premium Dental Lab', 4500, 'Lithium disilicate crown'),
+    ('Gold Crown', 'Premium Dental Lab', 5500, 'Full gold crown'),
+    ('Maryland Bridge', 'Premium Dental Lab', 4500, 'Resin-bonded bridge'),
+    ('3-Unit Bridge', 'Premium Dental Lab', 9000, 'Fixed bridge with 3 units'),
+    ('4-Unit Bridge', 'Premium Dental Lab', 12000, 'Fixed bridge with 4 units'),
+    ('Implant Crown (Screw-Retained)', 'Premium Dental Lab', 4000, 'Crown for implant with abutment'),
+    ('Implant Crown (Cement-Retained)', 'Premium Dental Lab', 3800, 'Cemented crown for implant'),
+    ('Implant-Supported Bridge (per unit)', 'Premium Dental Lab', 3500, 'Bridge unit on implant'),
+
+    # Elite Ceramics Lab - Veneers & Inlays
+    ('Porcelain Veneer', 'Elite Ceramics Lab', 3000, 'Thin ceramic veneer'),
+    ('Composite Veneer', 'Elite Ceramics Lab', 2000, 'Composite resin veneer'),
+    ('Ceramic Inlay', 'Elite Ceramics Lab', 2500, 'Indirect ceramic inlay'),
+    ('Ceramic Onlay', 'Elite Ceramics Lab', 3000, 'Indirect ceramic onlay'),
+    ('Lumineers (Ultra-thin Veneer)', 'Elite Ceramics Lab', 4000, 'Ultra-thin porcelain veneer'),
+
+    # Prosthetics Lab - Dentures
+    ('Full Denture (Acrylic)', 'Prosthetics Lab', 6000, 'Complete denture set'),
+    ('Full Denture (Premium)', 'Prosthetics Lab', 8500, 'Premium acrylic with better aesthetics'),
+    ('Partial Denture (Metal Frame)', 'Prosthetics Lab', 5500, 'Partial denture with chrome-cobalt frame'),
+    ('Partial Denture (Acrylic)', 'Prosthetics Lab', 3500, 'Basic acrylic partial denture'),
+    ('Flexible Denture (Valplast)', 'Prosthetics Lab', 7500, 'Flexible partial denture'),
+    ('Implant-Retained Denture', 'Prosthetics Lab', 15000, 'Full denture with implant attachments'),
+
+    # Appliance Lab - Guards & Retainers
+    ('Night Guard (Custom)', 'Appliance Lab', 1200, 'Custom-fabricated occlusal guard'),
+    ('Sports Mouth Guard', 'Appliance Lab', 800, 'Custom sports protection'),
+    ('Orthodontic Retainer (Hawley)', 'Appliance Lab', 800, 'Wire and acrylic retainer'),
+    ('Orthodontic Retainer (Clear)', 'Appliance Lab', 900, 'Clear plastic retainer'),
+    ('Bite Splint', 'Appliance Lab', 1500, 'TMJ treatment splint'),
+    ('Bleaching Tray (Custom)', 'Appliance Lab', 600, 'Custom whitening tray'),
+
+    # Quick Lab - Temporary Solutions
+    ('Temporary Crown (Acrylic)', 'Quick Lab', 500, 'Temporary crown'),
+    ('Temporary Bridge', 'Quick Lab', 1200, 'Temporary bridge'),
+    ('Diagnostic Wax-up', 'Quick Lab', 800, 'Wax model for treatment planning'),
+
+    # Advanced Ceramics Lab - Specialized
+    ('Bruxzir Crown', 'Advanced Ceramics Lab', 4000, 'High-strength zirconia crown'),
+    ('Layered Zirconia Crown', 'Advanced Ceramics Lab', 4200, 'Layered for better aesthetics'),
+    ('All-Ceramic Bridge (per unit)', 'Advanced Ceramics Lab', 3800, 'Metal-free bridge unit'),
+
+    # Digital Dental Lab - CAD/CAM
+    ('Digital Crown (Zirconia)', 'Digital Dental Lab', 3200, 'CAD/CAM milled zirconia crown'),
+    ('Digital Veneer', 'Digital Dental Lab', 2800, 'CAD/CAM pressed veneer'),
+    ('Digital Surgical Guide', 'Digital Dental Lab', 2000, 'Implant placement guide'),
+
+    # Smile Design Lab - Aesthetic Focus
+    ('Full Smile Makeover (per tooth)', 'Smile Design Lab', 3500, 'Complete aesthetic restoration'),
+    ('Custom Shade Crown', 'Smile Design Lab', 4000, 'Individually characterized crown'),
+
+    # Budget Dental Lab - Economy Options
+    ('Economy PFM Crown', 'Budget Dental Lab', 1800, 'Basic porcelain-fused-to-metal'),
+    ('Economy Denture', 'Budget Dental Lab', 4000, 'Basic full denture'),
+    ('Basic Retainer', 'Budget Dental Lab', 500, 'Simple retainer'),
+)
+
+
+# Services (name, chair_time_hours, doctor_hourly_fee, use_default_profit, custom_profit_percent, current_price)
+# Realistic dental service pricing (EGP 250 - 30,000 range)
+_SAMPLE_SERVICES = (
+    ('Consultation', 0.25, 300, 1, None, 250),  # Quick consultation
+    ('Dental Checkup & Cleaning', 0.75, 400, 1, None, 400),  # Basic cleaning
+    ('Composite Filling - Small', 0.5, 500, 1, None, 600),  # 1 surface
+    ('Composite Filling - Large', 1.0, 500, 1, None, 900),  # 3+ surfaces
+    ('Root Canal - Anterior', 1.5, 800, 1, None, 1800),  # Front tooth
+    ('Root Canal - Molar', 2.5, 1000, 1, None, 3500),  # Back tooth
+    ('Extraction - Simple', 0.5, 400, 1, None, 400),  # Mobile tooth
+    ('Extraction - Surgical', 1.0, 600, 1, None, 1200),  # Impacted
+    ('Wisdom Tooth Extraction', 1.5, 800, 1, None, 2500),  # Surgical wisdom
+    ('Zirconia Crown', 2.0, 800, 1, None, 6000),  # Premium crown
+    ('PFM Crown', 2.0, 700, 1, None, 4500),  # Porcelain fused metal
+    ('Veneer - Porcelain', 1.5, 800, 1, None, 5500),  # Per tooth
+    ('Teeth Whitening - In Office', 1.5, 500, 1, None, 3000),  # Full session
+    ('Deep Scaling & Root Planing', 1.5, 500, 1, None, 800),  # Per quadrant
+    ('Dental Implant - Single', 2.0, 1500, 1, None, 18000),  # Implant only
+    ('Implant with Crown', 3.0, 1500, 1, None, 25000),  # Complete
+    ('Full Denture - Upper or Lower', 3.0, 800, 1, None, 8000),  # Per arch
+    ('Partial Denture - Acrylic', 2.0, 600, 1, None, 4000),  # Basic
+    ('Night Guard', 1.0, 400, 1, None, 1500),  # Bruxism guard
+    ('Full Mouth Rehabilitation', 8.0, 2000, 1, None, 30000),  # Complex case
+)
+
+
+# Service Consumables Examples {service #: {consumable #: quantity}}
+# Numbers are 1-based positions in _SAMPLE_SERVICES / _SAMPLE_CONSUMABLES and
+# are mapped to the real row ids at insert time.
+# Consumable #: 1=Gloves, 2=Anesthetic, 3=Composite, 4=Bonding, 5=Etch, 6=Cotton, 7=Gauze,
+# 8=Suture, 9=Bur, 10=TempFill, 11=Bib, 12=ZircCrown, 13=PFMCrown, 14=Implant, 15=Abutment,
+# 16=GuttaPercha, 17=EndoFile, 18=ImpMaterial, 19=Alginate, 20=WhiteningGel
+_SAMPLE_SERVICE_CONSUMABLES = {
+    # Service 1: Consultation (minimal)
+    1: {
+        1: 2,     # 2 gloves
+        11: 1,    # 1 bib
+    },
+
+    # Service 2: Checkup & Cleaning
+    2: {
+        1: 4,     # 4 gloves
+        6: 10,    # 10 cotton rolls
+        7: 5,     # 5 gauze
+        11: 1,    # 1 bib
+    },
+
+    # Service 3: Composite Filling - Small
+    3: {
+        1: 4,     # 4 gloves
+        2: 1,     # 1 anesthetic cartridge
+        3: 0.3,   # 0.3 composite syringe
+        4: 1,     # 1 bonding application
+        5: 1,     # 1 etch application
+        6: 8,     # 8 cotton rolls
+        9: 1,     # 1 bur
+        11: 1,    # 1 bib
+    },
+
+    # Service 4: Composite Filling - Large
+    4: {
+        1: 4,     # 4 gloves
+        2: 1,     # 1 anesthetic
+        3: 0.6,   # 0.6 composite syringe
+        4: 2,     # 2 bonding applications
+        5: 1,     # 1 etch
+        6: 12,    # 12 cotton rolls
+        9: 2,     # 2 burs
+        11: 1,    # 1 bib
+    },
+
+    # Service 5: Root Canal - Anterior
+    5: {
+        1: 6,     # 6 gloves
+        2: 2,     # 2 anesthetic
+        6: 20,    # 20 cotton rolls
+        7: 10,    # 10 gauze
+        16: 5,    # 5 gutta percha points
+        17: 3,    # 3 endo files
+        10: 1,    # 1 temp fill
+        11: 1,    # 1 bib
+    },
+
+    # Service 6: Root Canal - Molar
+    6: {
+        1: 8,     # 8 gloves
+        2: 3,     # 3 anesthetic
+        6: 30,    # 30 cotton rolls
+        7: 15,    # 15 gauze
+        16: 12,   # 12 gutta percha points
+        17: 6,    # 6 endo files
+        10: 1,    # 1 temp fill
+        11: 1,    # 1 bib
+    },
+
+    # Service 10: Zirconia Crown
+    10: {
+        1: 6,     # 6 gloves
+        2: 2,     # 2 anesthetic
+        9: 3,     # 3 burs
+        18: 1,    # 1 impression
+        12: 1,    # 1 zirconia crown (lab)
+        10: 1,    # 1 temp fill
+        11: 1,    # 1 bib
+    },
+
+    # Service 11: PFM Crown
+    11: {
+        1: 6,     # 6 gloves
+        2: 2,     # 2 anesthetic
+        9: 3,     # 3 burs
+        18: 1,    # 1 impression
+        13: 1,    # 1 PFM crown (lab)
+        10: 1,    # 1 temp fill
+        11: 1,    # 1 bib
+    },
+
+    # Service 13: Teeth Whitening
+    13: {
+        1: 4,     # 4 gloves
+        20: 1,    # 1 whitening gel session
+        11: 1,    # 1 bib
+    },
+
+    # Service 15: Dental Implant
+    15: {
+        1: 8,     # 8 gloves
+        2: 3,     # 3 anesthetic
+        7: 20,    # 20 gauze
+        8: 2,     # 2 sutures
+        14: 1,    # 1 implant fixture
+        11: 1,    # 1 bib
+    },
+
+    # Service 16: Implant with Crown
+    16: {
+        1: 12,    # 12 gloves (multiple visits)
+        2: 4,     # 4 anesthetic
+        7: 25,    # 25 gauze
+        8: 2,     # 2 sutures
+        14: 1,    # 1 implant fixture
+        15: 1,    # 1 abutment
+        12: 1,    # 1 zirconia crown
+        18: 1,    # 1 impression
+        11: 2,    # 2 bibs
+    },
+}
+
+
+def create_sample_data(conn=None):
+    """Create sample data for demonstration; returns True if anything was seeded"""
+    with scoped_connection(conn) as conn:
+        cursor = conn.cursor()
+
+        # Get demo clinic ID and whether its data already exists in one round trip
+        cursor.execute('''
+            SELECT c.id, EXISTS(SELECT 1 FROM fixed_costs f WHERE f.clinic_id = c.id) AS seeded
+            FROM clinics c WHERE c.slug = 'demo-clinic'
+        ''')
+        row = cursor.fetchone()
+        if not row or row['seeded']:
+            return False
+        clinic_id = row['id']
+
+        # Every table is seeded inside the scoped connection's single transaction
+        _seed_clinic_rows(cursor, 'fixed_costs', ('category', 'monthly_amount', 'included', 'notes'),
+                          clinic_id, _SAMPLE_FIXED_COSTS)
+        _seed_clinic_rows(cursor, 'salaries', ('role_name', 'monthly_salary', 'included', 'notes'),
+                          clinic_id, _SAMPLE_SALARIES)
+        _seed_clinic_rows(cursor, 'equipment', ('asset_name', 'purchase_cost', 'life_years', 'allocation_type', 'monthly_usage_hours'),
+                          clinic_id, _SAMPLE_EQUIPMENT)
+        consumable_ids = _seed_clinic_rows(cursor, 'consumables', ('item_name', 'pack_cost', 'cases_per_pack', 'units_per_case'),
+                                           clinic_id, _SAMPLE_CONSUMABLES, return_ids=True)
+        _seed_clinic_rows(cursor, 'lab_materials', ('material_name', 'lab_name', 'unit_cost', 'description'),
+                          clinic_id, _SAMPLE_LAB_MATERIALS)
+        service_ids = _seed_clinic_rows(cursor, 'services', ('name', 'chair_time_hours', 'doctor_hourly_fee', 'use_default_profit', 'custom_profit_percent', 'current_price'),
+                                        clinic_id, _SAMPLE_SERVICES, return_ids=True)
+
+        service_consumables = ((service_ids[service_no - 1], consumable_ids[consumable_no - 1], qty)
+                               for service_no, quantities in _SAMPLE_SERVICE_CONSUMABLES.items()
+                               for consumable_no, qty in quantities.items())
+        _bulk_insert(cursor, 'service_consumables', ('service_id', 'consumable_id', 'quantity'), service_consumables)
+
+    return True
+
+
+# Set while create_sample_data_in_background() is seeding, so the API can
+# tell the dashboard the demo data is still being set up
+_sample_data_seeding = threading.Event()
+
+
+def sample_data_setting_up():
+    """True while this process is still seeding sample data in the background"""
+    return _sample_data_seeding.is_set()
+
+
+def _create_sample_data_serialized():
+    """Run create_sample_data() under a MySQL named lock
+
+    Every process that imports the app may start a seeder (both Werkzeug
+    reloader processes do), and the check-then-insert in create_sample_data()
+    is not atomic. The lock is taken before the transaction's first read and
+    released only after it commits, so a second seeder sees the first one's
+    rows and skips.
+    """
     conn = get_connection()
-    cursor = conn.cursor()
-
-    # Get demo clinic ID
-    cursor.execute("SELECT id FROM clinics WHERE slug = 'demo-clinic'")
-    row = cursor.fetchone()
-    if not row:
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT GET_LOCK('seed_sample_data', 60) AS acquired")
+        if not cursor.fetchone()['acquired']:
+            print("Warning: Sample data seeding skipped: another process holds the seed lock")
+            return
+        try:
+            seeded = create_sample_data(conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.execute("DO RELEASE_LOCK('seed_sample_data')")
+        if seeded:
+            sys.stdout.write("🔧 Sample data created successfully!\n")
+    finally:
         conn.close()
-        return
-    clinic_id = row['id']
+        _sample_data_seeding.clear()
 
-    # Check if data exists for this clinic
-    cursor.execute("SELECT COUNT(*) as cnt FROM fixed_costs WHERE clinic_id = %s", (clinic_id,))
-    if cursor.fetchone()['cnt'] > 0:
-        conn.close()
-        return
 
-    print("🔧 Creating sample data...")
-
-    # Fixed Costs
-    fixed_costs = [
-        (clinic_id, 'Rent', 20000, 1, 'Monthly clinic rent'),
-        (clinic_id, 'Utilities (electricity/water/internet)', 2500, 1, 'Base costs'),
-        (clinic_id, 'Admin/Marketing', 3000, 1, 'Administrative expenses'),
-        (clinic_id, 'Insurance', 0, 0, 'Optional'),
-        (clinic_id, 'Software/Subscriptions', 800, 1, 'Management software'),
-        (clinic_id, 'Cleaning/Laundry', 600, 1, 'Maintenance'),
-        (clinic_id, 'Miscellaneous Buffer', 500, 1, 'Unexpected costs'),
-    ]
-    cursor.executemany('''
-        INSERT INTO fixed_costs (clinic_id, category, monthly_amount, included, notes)
-        VALUES (%s, %s, %s, %s, %s)
-    ''', fixed_costs)
-
-    # Salaries
-    salaries = [
-        (clinic_id, 'Receptionist', 8000, 1, 'Front desk'),
-        (clinic_id, 'Assistant 1', 12000, 1, 'Clinical assistant'),
-        (clinic_id, 'Assistant 2', 12000, 1, 'Clinical assistant'),
-        (clinic_id, 'Cleaner', 4000, 1, 'Facility maintenance'),
-    ]
-    cursor.executemany('''
-        INSERT INTO salaries (clinic_id, role_name, monthly_salary, included, notes)
-        VALUES (%s, %s, %s, %s, %s)
-    ''', salaries)
-
-    # Equipment
-    equipment = [
-        (clinic_id, 'Dental Chair', 100000, 10, 'fixed', None),
-        (clinic_id, 'CBCT Machine', 800000, 8, 'fixed', None),
-        (clinic_id, 'Intraoral Scanner', 250000, 7, 'per-hour', 30),
-        (clinic_id, 'Laser Unit', 120000, 5, 'per-hour', 20),
-    ]
-    cursor.executemany('''
-        INSERT INTO equipment (clinic_id, asset_name, purchase_cost, life_years, allocation_type, monthly_usage_hours)
-        VALUES (%s, %s, %s, %s, %s, %s)
-    ''', equipment)
-
-    # Consumables (clinic_id, item_name, pack_cost, cases_per_pack, units_per_case)
-    # Realistic dental consumable pricing
-    consumables = [
-        (clinic_id, 'Nitrile Gloves (Box of 100)', 180, 1, 100),  # EGP 1.80 per pair
-        (clinic_id, 'Anesthetic Cartridge (Lidocaine 2%)', 850, 1, 50),  # EGP 17 per cartridge
-        (clinic_id, 'Composite Resin A2 (4g syringe)', 1200, 1, 1),  # EGP 1200 per syringe
-        (clinic_id, 'Bonding Agent (5ml bottle)', 900, 1, 40),  # ~EGP 22.50 per application
-        (clinic_id, 'Etch Gel 37% (3ml syringe)', 120, 1, 15),  # EGP 8 per application
-        (clinic_id, 'Cotton Rolls (Pack of 1000)', 250, 1, 1000),  # EGP 0.25 each
-        (clinic_id, 'Gauze 2x2 (Pack of 200)', 180, 1, 200),  # EGP 0.90 each
-        (clinic_id, 'Suture 3-0 Silk', 75, 1, 1),  # EGP 75 per suture
-        (clinic_id, 'Diamond Bur (Pack of 5)', 350, 1, 5),  # EGP 70 per bur
-        (clinic_id, 'Temporary Filling (Cavit)', 280, 1, 25),  # EGP 11.20 per application
-        (clinic_id, 'Disposable Bib', 200, 1, 100),  # EGP 2 each
-        (clinic_id, 'Zirconia Crown (Lab)', 3500, 1, 1),  # EGP 3500 per crown
-        (clinic_id, 'PFM Crown (Lab)', 2200, 1, 1),  # EGP 2200 per crown
-        (clinic_id, 'Implant Fixture (Korean)', 8500, 1, 1),  # EGP 8500 per implant
-        (clinic_id, 'Implant Abutment', 2500, 1, 1),  # EGP 2500 per abutment
-        (clinic_id, 'Gutta Percha Points (Pack)', 450, 1, 120),  # EGP 3.75 each
-        (clinic_id, 'Endodontic File (Pack of 6)', 280, 1, 6),  # EGP 46.67 each
-        (clinic_id, 'Impression Material (Heavy Body)', 650, 1, 10),  # EGP 65 per impression
-        (clinic_id, 'Alginate (450g bag)', 180, 1, 15),  # EGP 12 per impression
-        (clinic_id, 'Whitening Gel (Syringe)', 450, 1, 3),  # EGP 150 per session
-    ]
-    cursor.executemany('''
-        INSERT INTO consumables (clinic_id, item_name, pack_cost, cases_per_pack, units_per_case)
-        VALUES (%s, %s, %s, %s, %s)
-    ''', consumables)
-
-    # Lab Materials (clinic_id, material_name, lab_name, unit_cost, description)
-    # Materials from labs with direct per-unit pricing
-    materials = [
-        # Premium Dental Lab - Crowns & Bridges
-        (clinic_id, 'Zirconia Crown', 'Premium Dental Lab', 3500, 'High-quality ceramic crown'),
-        (clinic_id, 'PFM Crown', 'Premium Dental Lab', 2200, 'Porcelain-fused-to-metal crown'),
-        (clinic_id, 'Emax Crown', 'Premium Dental Lab', 4500, 'Lithium disilicate crown'),
-        (clinic_id, 'Gold Crown', 'Premium Dental Lab', 5500, 'Full gold crown'),
-        (clinic_id, 'Maryland Bridge', 'Premium Dental Lab', 4500, 'Resin-bonded bridge'),
-        (clinic_id, '3-Unit Bridge', 'Premium Dental Lab', 9000, 'Fixed bridge with 3 units'),
-        (clinic_id, '4-Unit Bridge', 'Premium Dental Lab', 12000, 'Fixed bridge with 4 units'),
-        (clinic_id, 'Implant Crown (Screw-Retained)', 'Premium Dental Lab', 4000, 'Crown for implant with abutment'),
-        (clinic_id, 'Implant Crown (Cement-Retained)', 'Premium Dental Lab', 3800, 'Cemented crown for implant'),
-        (clinic_id, 'Implant-Supported Bridge (per unit)', 'Premium Dental Lab', 3500, 'Bridge unit on implant'),
-
-        # Elite Ceramics Lab - Veneers & Inlays
-        (clinic_id, 'Porcelain Veneer', 'Elite Ceramics Lab', 3000, 'Thin ceramic veneer'),
-        (clinic_id, 'Composite Veneer', 'Elite Ceramics Lab', 2000, 'Composite resin veneer'),
-        (clinic_id, 'Ceramic Inlay', 'Elite Ceramics Lab', 2500, 'Indirect ceramic inlay'),
-        (clinic_id, 'Ceramic Onlay', 'Elite Ceramics Lab', 3000, 'Indirect ceramic onlay'),
-        (clinic_id, 'Lumineers (Ultra-thin Veneer)', 'Elite Ceramics Lab', 4000, 'Ultra-thin porcelain veneer'),
-
-        # Prosthetics Lab - Dentures
-        (clinic_id, 'Full Denture (Acrylic)', 'Prosthetics Lab', 6000, 'Complete denture set'),
-        (clinic_id, 'Full Denture (Premium)', 'Prosthetics Lab', 8500, 'Premium acrylic with better aesthetics'),
-        (clinic_id, 'Partial Denture (Metal Frame)', 'Prosthetics Lab', 5500, 'Partial denture with chrome-cobalt frame'),
-        (clinic_id, 'Partial Denture (Acrylic)', 'Prosthetics Lab', 3500, 'Basic acrylic partial denture'),
-        (clinic_id, 'Flexible Denture (Valplast)', 'Prosthetics Lab', 7500, 'Flexible partial denture'),
-        (clinic_id, 'Implant-Retained Denture', 'Prosthetics Lab', 15000, 'Full denture with implant attachments'),
-
-        # Appliance Lab - Guards & Retainers
-        (clinic_id, 'Night Guard (Custom)', 'Appliance Lab', 1200, 'Custom-fabricated occlusal guard'),
-        (clinic_id, 'Sports Mouth Guard', 'Appliance Lab', 800, 'Custom sports protection'),
-        (clinic_id, 'Orthodontic Retainer (Hawley)', 'Appliance Lab', 800, 'Wire and acrylic retainer'),
-        (clinic_id, 'Orthodontic Retainer (Clear)', 'Appliance Lab', 900, 'Clear plastic retainer'),
-        (clinic_id, 'Bite Splint', 'Appliance Lab', 1500, 'TMJ treatment splint'),
-        (clinic_id, 'Bleaching Tray (Custom)', 'Appliance Lab', 600, 'Custom whitening tray'),
-
-        # Quick Lab - Temporary Solutions
-        (clinic_id, 'Temporary Crown (Acrylic)', 'Quick Lab', 500, 'Temporary crown'),
-        (clinic_id, 'Temporary Bridge', 'Quick Lab', 1200, 'Temporary bridge'),
-        (clinic_id, 'Diagnostic Wax-up', 'Quick Lab', 800, 'Wax model for treatment planning'),
-
-        # Advanced Ceramics Lab - Specialized
-        (clinic_id, 'Bruxzir Crown', 'Advanced Ceramics Lab', 4000, 'High-strength zirconia crown'),
-        (clinic_id, 'Layered Zirconia Crown', 'Advanced Ceramics Lab', 4200, 'Layered for better aesthetics'),
-        (clinic_id, 'All-Ceramic Bridge (per unit)', 'Advanced Ceramics Lab', 3800, 'Metal-free bridge unit'),
-
-        # Digital Dental Lab - CAD/CAM
-        (clinic_id, 'Digital Crown (Zirconia)', 'Digital Dental Lab', 3200, 'CAD/CAM milled zirconia crown'),
-        (clinic_id, 'Digital Veneer', 'Digital Dental Lab', 2800, 'CAD/CAM pressed veneer'),
-        (clinic_id, 'Digital Surgical Guide', 'Digital Dental Lab', 2000, 'Implant placement guide'),
-
-        # Smile Design Lab - Aesthetic Focus
-        (clinic_id, 'Full Smile Makeover (per tooth)', 'Smile Design Lab', 3500, 'Complete aesthetic restoration'),
-        (clinic_id, 'Custom Shade Crown', 'Smile Design Lab', 4000, 'Individually characterized crown'),
-
-        # Budget Dental Lab - Economy Options
-        (clinic_id, 'Economy PFM Crown', 'Budget Dental Lab', 1800, 'Basic porcelain-fused-to-metal'),
-        (clinic_id, 'Economy Denture', 'Budget Dental Lab', 4000, 'Basic full denture'),
-        (clinic_id, 'Basic Retainer', 'Budget Dental Lab', 500, 'Simple retainer'),
-    ]
-    cursor.executemany('''
-        INSERT INTO lab_materials (clinic_id, material_name, lab_name, unit_cost, description)
-        VALUES (%s, %s, %s, %s, %s)
-    ''', materials)
-
-    # Services (clinic_id, name, chair_time_hours, doctor_hourly_fee, use_default_profit, custom_profit_percent, current_price)
-    # Realistic dental service pricing (EGP 250 - 30,000 range)
-    services = [
-        (clinic_id, 'Consultation', 0.25, 300, 1, None, 250),  # Quick consultation
-        (clinic_id, 'Dental Checkup & Cleaning', 0.75, 400, 1, None, 400),  # Basic cleaning
-        (clinic_id, 'Composite Filling - Small', 0.5, 500, 1, None, 600),  # 1 surface
-        (clinic_id, 'Composite Filling - Large', 1.0, 500, 1, None, 900),  # 3+ surfaces
-        (clinic_id, 'Root Canal - Anterior', 1.5, 800, 1, None, 1800),  # Front tooth
-        (clinic_id, 'Root Canal - Molar', 2.5, 1000, 1, None, 3500),  # Back tooth
-        (clinic_id, 'Extraction - Simple', 0.5, 400, 1, None, 400),  # Mobile tooth
-        (clinic_id, 'Extraction - Surgical', 1.0, 600, 1, None, 1200),  # Impacted
-        (clinic_id, 'Wisdom Tooth Extraction', 1.5, 800, 1, None, 2500),  # Surgical wisdom
-        (clinic_id, 'Zirconia Crown', 2.0, 800, 1, None, 6000),  # Premium crown
-        (clinic_id, 'PFM Crown', 2.0, 700, 1, None, 4500),  # Porcelain fused metal
-        (clinic_id, 'Veneer - Porcelain', 1.5, 800, 1, None, 5500),  # Per tooth
-        (clinic_id, 'Teeth Whitening - In Office', 1.5, 500, 1, None, 3000),  # Full session
-        (clinic_id, 'Deep Scaling & Root Planing', 1.5, 500, 1, None, 800),  # Per quadrant
-        (clinic_id, 'Dental Implant - Single', 2.0, 1500, 1, None, 18000),  # Implant only
-        (clinic_id, 'Implant with Crown', 3.0, 1500, 1, None, 25000),  # Complete
-        (clinic_id, 'Full Denture - Upper or Lower', 3.0, 800, 1, None, 8000),  # Per arch
-        (clinic_id, 'Partial Denture - Acrylic', 2.0, 600, 1, None, 4000),  # Basic
-        (clinic_id, 'Night Guard', 1.0, 400, 1, None, 1500),  # Bruxism guard
-        (clinic_id, 'Full Mouth Rehabilitation', 8.0, 2000, 1, None, 30000),  # Complex case
-    ]
-    cursor.executemany('''
-        INSERT INTO services (clinic_id, name, chair_time_hours, doctor_hourly_fee, use_default_profit, custom_profit_percent, current_price)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-    ''', services)
-
-    # Service Consumables Examples (service_id, consumable_id, quantity)
-    # Consumable IDs: 1=Gloves, 2=Anesthetic, 3=Composite, 4=Bonding, 5=Etch, 6=Cotton, 7=Gauze,
-    # 8=Suture, 9=Bur, 10=TempFill, 11=Bib, 12=ZircCrown, 13=PFMCrown, 14=Implant, 15=Abutment,
-    # 16=GuttaPercha, 17=EndoFile, 18=ImpMaterial, 19=Alginate, 20=WhiteningGel
-    service_consumables = [
-        # Service 1: Consultation (minimal)
-        (1, 1, 2),   # 2 gloves
-        (1, 11, 1),  # 1 bib
-
-        # Service 2: Checkup & Cleaning
-        (2, 1, 4),   # 4 gloves
-        (2, 6, 10),  # 10 cotton rolls
-        (2, 7, 5),   # 5 gauze
-        (2, 11, 1),  # 1 bib
-
-        # Service 3: Composite Filling - Small
-        (3, 1, 4),   # 4 gloves
-        (3, 2, 1),   # 1 anesthetic cartridge
-        (3, 3, 0.3), # 0.3 composite syringe
-        (3, 4, 1),   # 1 bonding application
-        (3, 5, 1),   # 1 etch application
-        (3, 6, 8),   # 8 cotton rolls
-        (3, 9, 1),   # 1 bur
-        (3, 11, 1),  # 1 bib
-
-        # Service 4: Composite Filling - Large
-        (4, 1, 4),   # 4 gloves
-        (4, 2, 1),   # 1 anesthetic
-        (4, 3, 0.6), # 0.6 composite syringe
-        (4, 4, 2),   # 2 bonding applications
-        (4, 5, 1),   # 1 etch
-        (4, 6, 12),  # 12 cotton rolls
-        (4, 9, 2),   # 2 burs
-        (4, 11, 1),  # 1 bib
-
-        # Service 5: Root Canal - Anterior
-        (5, 1, 6),   # 6 gloves
-        (5, 2, 2),   # 2 anesthetic
-        (5, 6, 20),  # 20 cotton rolls
-        (5, 7, 10),  # 10 gauze
-        (5, 16, 5),  # 5 gutta percha points
-        (5, 17, 3),  # 3 endo files
-        (5, 10, 1),  # 1 temp fill
-        (5, 11, 1),  # 1 bib
-
-        # Service 6: Root Canal - Molar
-        (6, 1, 8),   # 8 gloves
-        (6, 2, 3),   # 3 anesthetic
-        (6, 6, 30),  # 30 cotton rolls
-        (6, 7, 15),  # 15 gauze
-        (6, 16, 12), # 12 gutta percha points
-        (6, 17, 6),  # 6 endo files
-        (6, 10, 1),  # 1 temp fill
-        (6, 11, 1),  # 1 bib
-
-        # Service 10: Zirconia Crown
-        (10, 1, 6),  # 6 gloves
-        (10, 2, 2),  # 2 anesthetic
-        (10, 9, 3),  # 3 burs
-        (10, 18, 1), # 1 impression
-        (10, 12, 1), # 1 zirconia crown (lab)
-        (10, 10, 1), # 1 temp fill
-        (10, 11, 1), # 1 bib
-
-        # Service 11: PFM Crown
-        (11, 1, 6),  # 6 gloves
-        (11, 2, 2),  # 2 anesthetic
-        (11, 9, 3),  # 3 burs
-        (11, 18, 1), # 1 impression
-        (11, 13, 1), # 1 PFM crown (lab)
-        (11, 10, 1), # 1 temp fill
-        (11, 11, 1), # 1 bib
-
-        # Service 13: Teeth Whitening
-        (13, 1, 4),  # 4 gloves
-        (13, 20, 1), # 1 whitening gel session
-        (13, 11, 1), # 1 bib
-
-        # Service 15: Dental Implant
-        (15, 1, 8),  # 8 gloves
-        (15, 2, 3),  # 3 anesthetic
-        (15, 7, 20), # 20 gauze
-        (15, 8, 2),  # 2 sutures
-        (15, 14, 1), # 1 implant fixture
-        (15, 11, 1), # 1 bib
-
-        # Service 16: Implant with Crown
-        (16, 1, 12), # 12 gloves (multiple visits)
-        (16, 2, 4),  # 4 anesthetic
-        (16, 7, 25), # 25 gauze
-        (16, 8, 2),  # 2 sutures
-        (16, 14, 1), # 1 implant fixture
-        (16, 15, 1), # 1 abutment
-        (16, 12, 1), # 1 zirconia crown
-        (16, 18, 1), # 1 impression
-        (16, 11, 2), # 2 bibs
-    ]
-    cursor.executemany('''
-        INSERT INTO service_consumables (service_id, consumable_id, quantity)
-        VALUES (%s, %s, %s)
-    ''', service_consumables)
+def create_sample_data_in_background():
+    """Seed sample data on a daemon thread so startup does not wait on it
 
-    conn.commit()
-    conn.close()
-    print("Sample data created successfully!")
+    The thread borrows its own pooled connection; sample_data_setting_up()
+    reports True until it finishes.
+    """
+    _sample_data_seeding.set()
+    thread = threading.Thread(target=_create_sample_data_serialized, name='sample-data-seed', daemon=True)
+    thread.start()
+    return thread
@@ -10,16 +10,32 @@ Configuration (in .env):
 - MAIL_USERNAME: SMTP username
 - MAIL_PASSWORD: SMTP password
 - MAIL_DEFAULT_SENDER: Default sender email
+- MAIL_ASYNC: True/False - send from a background thread instead of the request
+- MAIL_MAX_EMAILS: Messages sent over one SMTP connection before reconnecting
 - FRONTEND_URL: URL for email links
 """
+import atexit
 import secrets
 import hashlib
+import queue
+import re
+import smtplib
+import threading
+import time
 from datetime import datetime, timedelta
 from flask import current_app
-from flask_mail import Mail, Message
+from flask_mail import Mail, Message, email_dispatched
+from jinja2 import Environment
 
 mail = Mail()
 
+# SMTP handshakes take hundreds of milliseconds, so with MAIL_ASYNC the
+# request only queues the message and a worker thread delivers it, sending
+# a burst of queued messages over one SMTP connection
+_mail_queue = queue.Queue()
+_mail_worker = None
+_mail_worker_lock = threading.Lock()
+
 
 def init_mail(app):
     """Initialize Flask-Mail with the application"""
@@ -71,6 +87,9 @@ def _send_email(subject, recipient, html_body, text_body, email_type="EMAIL", li
             html=html_body,
             body=text_body
         )
+        if current_app.config.get('MAIL_ASYNC', False):
+            _queue_email(current_app._get_current_object(), msg, email_type)
+            return True, f"{email_type} queued for sending"
         mail.send(msg)
         return True, f"{email_type} sent successfully"
     except Exception as e:
@@ -78,25 +97,109 @@ def _send_email(subject, recipient, html_body, text_body, email_type="EMAIL", li
         return False, str(e)
 
 
-def send_verification_email(user_email, user_name, token):
-    """Send email verification link to user"""
-    frontend_url = current_app.config.get('FRONTEND_URL', 'http://localhost:5002')
-    verification_link = f"{frontend_url}/verify-email?token={token}"
-    expiry_hours = current_app.config.get('EMAIL_VERIFICATION_EXPIRY_HOURS', 24)
+def _queue_email(app, msg, email_type):
+    """Hand a message to the email worker, starting it on first use"""
+    global _mail_worker
+    with _mail_worker_lock:
+        if _mail_worker is None or not _mail_worker.is_alive():
+            _mail_worker = threading.Thread(target=_mail_worker_loop, name='email-worker', daemon=True)
+            _mail_worker.start()
+    _mail_queue.put((app, msg, email_type))
 
-    subject = "Verify Your Email - Dental Pricing Calculator"
 
-    html_body = f"""
+def _mail_worker_loop():
+    """Deliver queued messages, reusing one SMTP connection until the queue is empty
+
+    Flask-Mail recycles the connection itself after MAIL_MAX_EMAILS messages.
+    """
+    while True:
+        batch = [_mail_queue.get()]
+        app = batch[0][0]
+        with app.app_context():
+            try:
+                with mail.connect() as conn:
+                    while batch:
+                        _, msg, email_type = batch.pop()
+                        _deliver(conn, msg, email_type)
+                        _mail_queue.task_done()
+                        try:
+                            batch.append(_mail_queue.get_nowait())
+                        except queue.Empty:
+                            pass
+            except Exception as e:
+                if not batch:
+                    # Everything was sent; only the closing QUIT failed
+                    continue
+                # Could not connect: this message is dropped, later ones retry
+                for _, _, email_type in batch:
+                    app.logger.error(f"Failed to send {email_type}: {str(e)}")
+                    _mail_queue.task_done()
+
+
+def _deliver(conn, msg, email_type):
+    """Send one message on an open connection, reconnecting once if the server hung up"""
+    accepted = []
+
+    def _record_accepted(app, message, **kwargs):
+        if message is msg:
+            accepted.append(message)
+
+    try:
+        # Flask-Mail signals email_dispatched as soon as the server has taken
+        # the message, before it may recycle the connection after
+        # MAIL_MAX_EMAILS; a disconnect after that point must not resend it
+        with email_dispatched.connected_to(_record_accepted):
+            for attempt in range(2):
+                try:
+                    conn.send(msg)
+                    return
+                except smtplib.SMTPServerDisconnected:
+                    if attempt and not accepted:
+                        raise
+                    conn.host = conn.configure_host()
+                    if accepted:
+                        return
+    except Exception as e:
+        current_app.logger.error(f"Failed to send {email_type}: {str(e)}")
+
+
+# How long process exit waits for queued messages; Flask-Mail's SMTP
+# connection has no socket timeout, so a stuck server must not hang shutdown
+MAIL_DRAIN_TIMEOUT = 30
+
+
+def _drain_mail_queue(timeout=MAIL_DRAIN_TIMEOUT):
+    """Wait, up to timeout seconds, for the worker to deliver queued messages"""
+    deadline = time.monotonic() + timeout
+    while _mail_queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.1)
+
+
+atexit.register(_drain_mail_queue)
+
+
+def _minify_html(source):
+    """Drop the source indentation and the whitespace between tags of an HTML body"""
+    return re.sub(r'>\s+<', '><', re.sub(r'\s*\n\s*', '\n', source.strip()))
+
+
+# Email bodies are compiled once at import; each send only renders the
+# per-recipient fields. HTML bodies autoescape those fields, and are minified
+# here too, so every message carries the smaller markup.
+_html_env = Environment(autoescape=True, keep_trailing_newline=True)
+_text_env = Environment(autoescape=False, keep_trailing_newline=True)
+
+_VERIFY_HTML = _html_env.from_string(_minify_html("""
     <!DOCTYPE html>
     <html>
     <head>
         <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
-            .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }}
-            .button {{ display: inline-block; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 15px 30px; text-decoration: none; border-radius: 5px; margin: 20px 0; }}
-            .footer {{ text-align: center; margin-top: 20px; color: #666; font-size: 12px; }}
+            body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+            .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+            .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }
+            .content { background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }
+            .button { display: inline-block; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 15px 30px; text-decoration: none; border-radius: 5px; margin: 20px 0; }
+            .footer { text-align: center; margin-top: 20px; color: #666; font-size: 12px; }
         </style>
     </head>
     <body>
@@ -105,14 +208,14 @@ def send_verification_email(user_email, user_name, token):
                 <h1>Welcome to Dental Pricing Calculator</h1>
             </div>
             <div class="content">
-                <p>Hello {user_name},</p>
+                <p>Hello {{ user_name }},</p>
                 <p>Thank you for registering! Please verify your email address by clicking the button below:</p>
                 <p style="text-align: center;">
-                    <a href="{verification_link}" class="button">Verify Email Address</a>
+                    <a href="{{ verification_link }}" class="button">Verify Email Address</a>
                 </p>
                 <p>Or copy and paste this link into your browser:</p>
-                <p style="word-break: break-all; color: #667eea;">{verification_link}</p>
-                <p>This link will expire in {expiry_hours} hours.</p>
+                <p style="word-break: break-all; color: #667eea;">{{ verification_link }}</p>
+                <p>This link will expire in {{ expiry_hours }} hours.</p>
                 <p>If you didn't create an account, you can safely ignore this email.</p>
             </div>
             <div class="footer">
@@ -121,54 +224,36 @@ def send_verification_email(user_email, user_name, token):
         </div>
     </body>
     </html>
-    """
+    """))
 
-    text_body = f"""
+_VERIFY_TEXT = _text_env.from_string("""
     Welcome to Dental Pricing Calculator!
 
-    Hello {user_name},
+    Hello {{ user_name }},
 
     Thank you for registering! Please verify your email address by clicking the link below:
 
-    {verification_link}
+    {{ verification_link }}
 
-    This link will expire in {expiry_hours} hours.
+    This link will expire in {{ expiry_hours }} hours.
 
     If you didn't create an account, you can safely ignore this email.
 
     - Dental Pricing Calculator Team
-    """
+    """)
 
-    return _send_email(
-        subject=subject,
-        recipient=user_email,
-        html_body=html_body,
-        text_body=text_body,
-        email_type="VERIFICATION",
-        link=verification_link
-    )
-
-
-def send_password_reset_email(user_email, user_name, token):
-    """Send password reset link to user"""
-    frontend_url = current_app.config.get('FRONTEND_URL', 'http://localhost:5002')
-    reset_link = f"{frontend_url}/reset-password?token={token}"
-    expiry_hours = current_app.config.get('PASSWORD_RESET_EXPIRY_HOURS', 1)
-
-    subject = "Reset Your Password - Dental Pricing Calculator"
-
-    html_body = f"""
+_RESET_HTML = _html_env.from_string(_minify_html("""
     <!DOCTYPE html>
     <html>
     <head>
         <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
-            .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }}
-            .button {{ display: inline-block; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 15px 30px; text-decoration: none; border-radius: 5px; margin: 20px 0; }}
-            .footer {{ text-align: center; margin-top: 20px; color: #666; font-size: 12px; }}
-            .warning {{ background: #fff3cd; border: 1px solid #ffc107; padding: 15px; border-radius: 5px; margin: 15px 0; }}
+            body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+            .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+            .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }
+            .content { background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }
+            .button { display: inline-block; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 15px 30px; text-decoration: none; border-radius: 5px; margin: 20px 0; }
+            .footer { text-align: center; margin-top: 20px; color: #666; font-size: 12px; }
+            .warning { background: #fff3cd; border: 1px solid #ffc107; padding: 15px; border-radius: 5px; margin: 15px 0; }
         </style>
     </head>
     <body>
@@ -177,15 +262,15 @@ def send_password_reset_email(user_email, user_name, token):
                 <h1>Password Reset Request</h1>
             </div>
             <div class="content">
-                <p>Hello {user_name},</p>
+                <p>Hello {{ user_name }},</p>
                 <p>We received a request to reset your password. Click the button below to create a new password:</p>
                 <p style="text-align: center;">
-                    <a href="{reset_link}" class="button">Reset Password</a>
+                    <a href="{{ reset_link }}" class="button">Reset Password</a>
                 </p>
                 <p>Or copy and paste this link into your browser:</p>
-                <p style="word-break: break-all; color: #667eea;">{reset_link}</p>
+                <p style="word-break: break-all; color: #667eea;">{{ reset_link }}</p>
                 <div class="warning">
-                    <strong>Important:</strong> This link will expire in {expiry_hours} hour(s) for security reasons.
+                    <strong>Important:</strong> This link will expire in {{ expiry_hours }} hour(s) for security reasons.
                 </div>
                 <p>If you didn't request a password reset, you can safely ignore this email. Your password will remain unchanged.</p>
             </div>
@@ -195,49 +280,35 @@ def send_password_reset_email(user_email, user_name, token):
         </div>
     </body>
     </html>
-    """
+    """))
 
-    text_body = f"""
+_RESET_TEXT = _text_env.from_string("""
     Password Reset Request
 
-    Hello {user_name},
+    Hello {{ user_name }},
 
     We received a request to reset your password. Click the link below to create a new password:
 
-    {reset_link}
+    {{ reset_link }}
 
-    Important: This link will expire in {expiry_hours} hour(s) for security reasons.
+    Important: This link will expire in {{ expiry_hours }} hour(s) for security reasons.
 
     If you didn't request a password reset, you can safely ignore this email. Your password will remain unchanged.
 
     - Dental Pricing Calculator Team
-    """
-
-    return _send_email(
-        subject=subject,
-        recipient=user_email,
-        html_body=html_body,
-        text_body=text_body,
-        email_type="PASSWORD_RESET",
-        link=reset_link
-    )
-
-
-def send_password_changed_notification(user_email, user_name):
-    """Send notification that password was changed"""
-    subject = "Password Changed - Dental Pricing Calculator"
+    """)
 
-    html_body = f"""
+_PASSWORD_CHANGED_HTML = _html_env.from_string(_minify_html("""
     <!DOCTYPE html>
     <html>
     <head>
         <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
-            .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }}
-            .footer {{ text-align: center; margin-top: 20px; color: #666; font-size: 12px; }}
-            .alert {{ background: #d4edda; border: 1px solid #28a745; padding: 15px; border-radius: 5px; margin: 15px 0; }}
+            body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+            .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+            .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }
+            .content { background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }
+            .footer { text-align: center; margin-top: 20px; color: #666; font-size: 12px; }
+            .alert { background: #d4edda; border: 1px solid #28a745; padding: 15px; border-radius: 5px; margin: 15px 0; }
         </style>
     </head>
     <body>
@@ -246,7 +317,7 @@ def send_password_changed_notification(user_email, user_name):
                 <h1>Password Changed</h1>
             </div>
             <div class="content">
-                <p>Hello {user_name},</p>
+                <p>Hello {{ user_name }},</p>
                 <div class="alert">
                     Your password has been successfully changed.
                 </div>
@@ -259,12 +330,12 @@ def send_password_changed_notification(user_email, user_name):
         </div>
     </body>
     </html>
-    """
+    """))
 
-    text_body = f"""
+_PASSWORD_CHANGED_TEXT = _text_env.from_string("""
     Password Changed
 
-    Hello {user_name},
+    Hello {{ user_name }},
 
     Your password has been successfully changed.
 
@@ -273,7 +344,57 @@ def send_password_changed_notification(user_email, user_name):
     If you did not change your password, please contact us immediately as your account may have been compromised.
 
     - Dental Pricing Calculator Team
-    """
+    """)
+
+
+def send_verification_email(user_email, user_name, token):
+    """Send email verification link to user"""
+    frontend_url = current_app.config.get('FRONTEND_URL', 'http://localhost:5002')
+    verification_link = f"{frontend_url}/verify-email?token={token}"
+    expiry_hours = current_app.config.get('EMAIL_VERIFICATION_EXPIRY_HOURS', 24)
+
+    subject = "Verify Your Email - Dental Pricing Calculator"
+
+    html_body = _VERIFY_HTML.render(user_name=user_name, verification_link=verification_link, expiry_hours=expiry_hours)
+    text_body = _VERIFY_TEXT.render(user_name=user_name, verification_link=verification_link, expiry_hours=expiry_hours)
+
+    return _send_email(
+        subject=subject,
+        recipient=user_email,
+        html_body=html_body,
+        text_body=text_body,
+        email_type="VERIFICATION",
+        link=verification_link
+    )
+
+
+def send_password_reset_email(user_email, user_name, token):
+    """Send password reset link to user"""
+    frontend_url = current_app.config.get('FRONTEND_URL', 'http://localhost:5002')
+    reset_link = f"{frontend_url}/reset-password?token={token}"
+    expiry_hours = current_app.config.get('PASSWORD_RESET_EXPIRY_HOURS', 1)
+
+    subject = "Reset Your Password - Dental Pricing Calculator"
+
+    html_body = _RESET_HTML.render(user_name=user_name, reset_link=reset_link, expiry_hours=expiry_hours)
+    text_body = _RESET_TEXT.render(user_name=user_name, reset_link=reset_link, expiry_hours=expiry_hours)
+
+    return _send_email(
+        subject=subject,
+        recipient=user_email,
+        html_body=html_body,
+        text_body=text_body,
+        email_type="PASSWORD_RESET",
+        link=reset_link
+    )
+
+
+def send_password_changed_notification(user_email, user_name):
+    """Send notification that password was changed"""
+    subject = "Password Changed - Dental Pricing Calculator"
+
+    html_body = _PASSWORD_CHANGED_HTML.render(user_name=user_name)
+    text_body = _PASSWORD_CHANGED_TEXT.render(user_name=user_name)
 
     return _send_email(
         subject=subject,
@@ -3,7 +3,7 @@ Models Module - Data access and business logic for Dental Pricing Calculator
 Multi-tenant SaaS version with clinic isolation
 """
 
-from .database import get_connection, dict_from_row, hash_password, verify_password, create_default_categories, create_clinic_starter_data
+from .database import get_connection, dict_from_row, hash_password, verify_password, password_needs_rehash, create_default_categories, create_clinic_starter_data
 import secrets
 import hashlib
 import re
@@ -123,11 +123,17 @@ def authenticate_user(username, password):
         WHERE (u.username = %s OR u.email = %s) AND u.is_active = 1
     ''', (username, username))
     row = cursor.fetchone()
-    conn.close()
 
     if row and verify_password(password, row['password_hash']):
+        # Upgrade legacy/outdated hashes while the plaintext is at hand
+        if password_needs_rehash(row['password_hash']):
+            cursor.execute('UPDATE users SET password_hash = %s WHERE id = %s',
+                           (hash_password(password), row['id']))
+            conn.commit()
+        conn.close()
         user = dict_from_row(row)
         return user
+    conn.close()
     return None
 
 
@@ -167,7 +173,7 @@ def get_clinic_users(clinic_id):
     ''', (clinic_id,))
     rows = cursor.fetchall()
     conn.close()
-    return [dict_from_row(r) for r in rows]
+    return list(rows)
 
 
 def update_user(user_id, clinic_id, **kwargs):
@@ -293,7 +299,7 @@ def get_all_fixed_costs(clinic_id):
     cursor.execute('SELECT * FROM fixed_costs WHERE clinic_id = %s ORDER BY created_at ASC', (clinic_id,))
     rows = cursor.fetchall()
     conn.close()
-    return [dict_from_row(r) for r in rows]
+    return list(rows)
 
 
 def create_fixed_cost(clinic_id, category, monthly_amount, included=1, notes=''):
@@ -350,7 +356,7 @@ def get_all_salaries(clinic_id):
     cursor.execute('SELECT * FROM salaries WHERE clinic_id = %s ORDER BY created_at ASC', (clinic_id,))
     rows = cursor.fetchall()
     conn.close()
-    return [dict_from_row(r) for r in rows]
+    return list(rows)
 
 
 def create_salary(clinic_id, role_name, monthly_salary, included=1, notes=''):
@@ -407,7 +413,7 @@ def get_all_equipment(clinic_id):
     cursor.execute('SELECT * FROM equipment WHERE clinic_id = %s ORDER BY created_at ASC', (clinic_id,))
     rows = cursor.fetchall()
     conn.close()
-    return [dict_from_row(r) for r in rows]
+    return list(rows)
 
 
 def create_equipment(clinic_id, asset_name, purchase_cost, life_years, allocation_type, monthly_usage_hours=None):
@@ -511,7 +517,7 @@ def get_all_consumables(clinic_id):
     cursor.execute('SELECT * FROM consumables WHERE clinic_id = %s ORDER BY item_name', (clinic_id,))
     rows = cursor.fetchall()
     conn.close()
-    return [dict_from_row(r) for r in rows]
+    return list(rows)
 
 
 def create_consumable(clinic_id, item_name, pack_cost, cases_per_pack, units_per_case=1, name_ar=None):
@@ -573,7 +579,7 @@ def get_all_materials(clinic_id):
     cursor.execute('SELECT * FROM lab_materials WHERE clinic_id = %s ORDER BY material_name', (clinic_id,))
     rows = cursor.fetchall()
     conn.close()
-    return [dict_from_row(r) for r in rows]
+    return list(rows)
 
 
 def create_material(clinic_id, material_name, unit_cost, lab_name=None, description=None, name_ar=None):
@@ -635,7 +641,7 @@ def get_all_categories(clinic_id):
     cursor.execute('SELECT * FROM service_categories WHERE clinic_id = %s AND is_active = 1 ORDER BY display_order, name', (clinic_id,))
     rows = cursor.fetchall()
     conn.close()
-    return [dict_from_row(r) for r in rows]
+    return list(rows)
 
 
 def get_category_by_id(category_id, clinic_id):
@@ -718,7 +724,7 @@ def get_all_services(clinic_id):
     ''', (clinic_id,))
     rows = cursor.fetchall()
     conn.close()
-    return [dict_from_row(r) for r in rows]
+    return list(rows)
 
 
 def get_service_by_id(service_id, clinic_id):
@@ -736,7 +742,7 @@ def get_service_by_id(service_id, clinic_id):
             JOIN consumables c ON sc.consumable_id = c.id
             WHERE sc.service_id = %s
         ''', (service_id,))
-        service['consumables'] = [dict_from_row(r) for r in cursor.fetchall()]
+        service['consumables'] = list(cursor.fetchall())
 
         # Get materials for this service
         cursor.execute('''
@@ -745,7 +751,7 @@ def get_service_by_id(service_id, clinic_id):
             JOIN lab_materials m ON sm.material_id = m.id
             WHERE sm.service_id = %s
         ''', (service_id,))
-        service['materials'] = [dict_from_row(r) for r in cursor.fetchall()]
+        service['materials'] = list(cursor.fetchall())
 
         # Get equipment for this service (from service_equipment table)
         cursor.execute('''
@@ -754,7 +760,7 @@ def get_service_by_id(service_id, clinic_id):
             JOIN equipment e ON se.equipment_id = e.id
             WHERE se.service_id = %s
         ''', (service_id,))
-        service['equipment_list'] = [dict_from_row(r) for r in cursor.fetchall()]
+        service['equipment_list'] = list(cursor.fetchall())
 
     conn.close()
     return service
@@ -815,11 +821,8 @@ def delete_service(service_id, clinic_id):
     conn = get_connection()
     try:
         cursor = conn.cursor()
-        # Explicitly delete child records first (even though CASCADE should handle it)
-        cursor.execute('DELETE FROM service_consumables WHERE service_id = %s', (service_id,))
-        cursor.execute('DELETE FROM service_materials WHERE service_id = %s', (service_id,))
-        cursor.execute('DELETE FROM service_equipment WHERE service_id = %s', (service_id,))
-        # Then delete the service itself
+        # service_consumables, service_materials and service_equipment rows go
+        # with it through their ON DELETE CASCADE foreign keys
         cursor.execute('DELETE FROM services WHERE id = %s AND clinic_id = %s', (service_id, clinic_id))
         conn.commit()
         return True
@@ -861,13 +864,11 @@ def update_service_consumables(service_id, consumables):
     # Delete existing
     cursor.execute('DELETE FROM service_consumables WHERE service_id = %s', (service_id,))
 
-    # Insert new
-    for c in consumables:
-        custom_price = c.get('custom_unit_price')
-        cursor.execute('''
-            INSERT INTO service_consumables (service_id, consumable_id, quantity, custom_unit_price)
-            VALUES (%s, %s, %s, %s)
-        ''', (service_id, c['consumable_id'], c['quantity'], custom_price))
+    # Insert new (executemany is rewritten by PyMySQL into one multi-row INSERT)
+    cursor.executemany('''
+        INSERT INTO service_consumables (service_id, consumable_id, quantity, custom_unit_price)
+        VALUES (%s, %s, %s, %s)
+    ''', [(service_id, c['consumable_id'], c['quantity'], c.get('custom_unit_price')) for c in consumables])
 
     conn.commit()
     conn.close()
@@ -908,13 +909,11 @@ def update_service_materials(service_id, materials):
     # Delete existing
     cursor.execute('DELETE FROM service_materials WHERE service_id = %s', (service_id,))
 
-    # Insert new
-    for m in materials:
-        custom_price = m.get('custom_unit_price')
-        cursor.execute('''
-            INSERT INTO service_materials (service_id, material_id, quantity, custom_unit_price)
-            VALUES (%s, %s, %s, %s)
-        ''', (service_id, m['material_id'], m['quantity'], custom_price))
+    # Insert new (executemany is rewritten by PyMySQL into one multi-row INSERT)
+    cursor.executemany('''
+        INSERT INTO service_materials (service_id, material_id, quantity, custom_unit_price)
+        VALUES (%s, %s, %s, %s)
+    ''', [(service_id, m['material_id'], m['quantity'], m.get('custom_unit_price')) for m in materials])
 
     conn.commit()
     conn.close()
@@ -929,12 +928,11 @@ def update_service_equipment(service_id, equipment_list):
     # Delete existing
     cursor.execute('DELETE FROM service_equipment WHERE service_id = %s', (service_id,))
 
-    # Insert new
-    for eq in equipment_list:
-        cursor.execute('''
-            INSERT INTO service_equipment (service_id, equipment_id, hours_used)
-            VALUES (%s, %s, %s)
-        ''', (service_id, eq['equipment_id'], eq['hours_used']))
+    # Insert new (executemany is rewritten by PyMySQL into one multi-row INSERT)
+    cursor.executemany('''
+        INSERT INTO service_equipment (service_id, equipment_id, hours_used)
+        VALUES (%s, %s, %s)
+    ''', [(service_id, eq['equipment_id'], eq['hours_used']) for eq in equipment_list])
 
     conn.commit()
     conn.close()
@@ -1136,13 +1134,13 @@ def calculate_all_services(clinic_id):
     capacity = dict_from_row(cursor.fetchone())
 
     cursor.execute('SELECT * FROM fixed_costs WHERE clinic_id = %s', (clinic_id,))
-    fixed_costs = [dict_from_row(r) for r in cursor.fetchall()]
+    fixed_costs = list(cursor.fetchall())
 
     cursor.execute('SELECT * FROM salaries WHERE clinic_id = %s', (clinic_id,))
-    salaries = [dict_from_row(r) for r in cursor.fetchall()]
+    salaries = list(cursor.fetchall())
 
     cursor.execute('SELECT * FROM equipment WHERE clinic_id = %s', (clinic_id,))
-    equipment_list = [dict_from_row(r) for r in cursor.fetchall()]
+    equipment_list = list(cursor.fetchall())
 
     # Fetch all services with category info
     cursor.execute('''
@@ -1152,7 +1150,7 @@ def calculate_all_services(clinic_id):
         WHERE s.clinic_id = %s
         ORDER BY sc.display_order, sc.name, s.name
     ''', (clinic_id,))
-    all_services = [dict_from_row(r) for r in cursor.fetchall()]
+    all_services = list(cursor.fetchall())
 
     if not all_services:
         conn.close()
@@ -1168,7 +1166,7 @@ def calculate_all_services(clinic_id):
         JOIN consumables c ON sc.consumable_id = c.id
         WHERE sc.service_id IN ({format_ids})
     ''', service_ids)
-    all_consumables = [dict_from_row(r) for r in cursor.fetchall()]
+    all_consumables = list(cursor.fetchall())
 
     # Bulk fetch materials for all services
     cursor.execute(f'''
@@ -1177,7 +1175,7 @@ def calculate_all_services(clinic_id):
         JOIN lab_materials m ON sm.material_id = m.id
         WHERE sm.service_id IN ({format_ids})
     ''', service_ids)
-    all_materials = [dict_from_row(r) for r in cursor.fetchall()]
+    all_materials = list(cursor.fetchall())
 
     # Bulk fetch equipment for all services
     cursor.execute(f'''
@@ -1186,7 +1184,7 @@ def calculate_all_services(clinic_id):
         JOIN equipment e ON se.equipment_id = e.id
         WHERE se.service_id IN ({format_ids})
     ''', service_ids)
-    all_service_equipment = [dict_from_row(r) for r in cursor.fetchall()]
+    all_service_equipment = list(cursor.fetchall())
 
     conn.close()
 
@@ -1364,7 +1362,7 @@ def get_all_clinics_admin():
     ''')
     rows = cursor.fetchall()
     conn.close()
-    return [dict_from_row(r) for r in rows]
+    return list(rows)
 
 
 def get_clinic_payments(clinic_id):
@@ -1380,7 +1378,7 @@ def get_clinic_payments(clinic_id):
     ''', (clinic_id,))
     rows = cursor.fetchall()
     conn.close()
-    return [dict_from_row(r) for r in rows]
+    return list(rows)
 
 
 def record_payment(clinic_id, amount, payment_date, payment_method, months_paid, recorded_by,
@@ -2138,7 +2136,7 @@ def get_all_bundles(clinic_id):
     ''', (clinic_id,))
     rows = cursor.fetchall()
     conn.close()
-    return [dict_from_row(r) for r in rows]
+    return list(rows)
 
 
 def get_bundle_by_id(bundle_id, clinic_id):
@@ -2169,7 +2167,7 @@ def get_bundle_by_id(bundle_id, clinic_id):
     conn.close()
 
     bundle = dict_from_row(bundle)
-    bundle['items'] = [dict_from_row(i) for i in items]
+    bundle['items'] = list(items)
     return bundle
 
 